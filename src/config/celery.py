@@ -5,9 +5,24 @@ from __future__ import annotations
 import os
 
 from celery import Celery
+from kombu.serialization import register
+
+try:
+    import orjson
+except ImportError:  # optional faster serializer
+    orjson = None
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "src.config.settings")
 
+if orjson is not None:
+    register(
+        "orjson",
+        orjson.dumps,
+        orjson.loads,
+        content_type="application/x-orjson",
+        content_encoding="binary",
+    )
+
 app = Celery("match_cv")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
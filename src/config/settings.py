@@ -93,6 +93,8 @@ else:
             "PASSWORD": env("DB_PASSWORD", default="match_cv"),
             "HOST": env("DB_HOST", default="localhost"),
             "PORT": env("DB_PORT", default="5432"),
+            "CONN_MAX_AGE": env.int("DB_CONN_MAX_AGE", default=600),
+            "CONN_HEALTH_CHECKS": True,
         }
     }
 
@@ -119,8 +121,19 @@ EMBEDDING_DIM = env.int("EMBEDDING_DIM", default=1536)
 REDIS_URL = env("REDIS_URL", default="redis://localhost:6379/0")
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default=REDIS_URL)
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://localhost:6379/1")
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
+# "orjson" is registered by src.config.celery when the package is installed.
+CELERY_ACCEPT_CONTENT = env.list("CELERY_ACCEPT_CONTENT", default=["json"])
+CELERY_TASK_SERIALIZER = env("CELERY_TASK_SERIALIZER", default="json")
+CELERY_RESULT_SERIALIZER = env("CELERY_RESULT_SERIALIZER", default="json")
 CELERY_TIMEZONE = env("CELERY_TIMEZONE", default="UTC")
 CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
+# Ingestion and search tasks run for seconds: reserve one message per process so queued
+# work is not stuck behind a busy child, and acknowledge only after completion.
+CELERY_WORKER_PREFETCH_MULTIPLIER = env.int("CELERY_WORKER_PREFETCH_MULTIPLIER", default=1)
+CELERY_TASK_ACKS_LATE = env.bool("CELERY_TASK_ACKS_LATE", default=True)
+# Each prefork child warms its own ingestion and RAG pipelines and keeps one persistent
+# Postgres connection (CONN_MAX_AGE), so a worker costs CELERY_CONCURRENCY connections on
+# top of the web processes. Tasks mostly wait on OpenAI, so deployments with connection
+# headroom can raise CELERY_CONCURRENCY above the core count.
+CELERY_WORKER_CONCURRENCY = env.int("CELERY_CONCURRENCY", default=4)
+CELERY_BROKER_POOL_LIMIT = env.int("CELERY_BROKER_POOL_LIMIT", default=20)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import F, Func, IntegerField
 
 from src.core.models import CVDocument, Chunk, UploadBatch, UploadItem
 
@@ -18,13 +19,34 @@ class ChunksAdmin(admin.ModelAdmin):
     search_fields = ("id", "document__id")
     readonly_fields = ("id", "created_at", "updated_at")
     raw_id_fields = ("document",)
+    list_select_related = ("document",)
+
+    def get_queryset(self, request):
+        # Only the dimension count is displayed, so let Postgres compute it instead of
+        # shipping every embedding to the list page. The joined document is shown through
+        # __str__ alone, so its large columns are left out too.
+        return (
+            super()
+            .get_queryset(request)
+            .defer(
+                "embedding",
+                "document__raw_text",
+                "document__metadata",
+                "document__search_vector",
+            )
+            .annotate(
+                embedding_dims=Func(
+                    F("embedding"), function="vector_dims", output_field=IntegerField()
+                )
+            )
+        )
 
     @admin.display(description="Embedding")
     def embedding_preview(self, obj):
-        value = getattr(obj, "embedding", None)
-        if value is None:
+        dims = getattr(obj, "embedding_dims", None)
+        if dims is None:
             return "-"
-        return f"vector[{len(value)}]"
+        return f"vector[{dims}]"
 
 
 @admin.register(UploadBatch)
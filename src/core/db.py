@@ -1,22 +1,44 @@
 from __future__ import annotations
 
 import environ
-from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
-from django.db import transaction
-from django.db.models import TextField, Value
-from django.db.models.functions import Cast, Coalesce
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import CharField, F, Value
 from datapizza.core.vectorstore import Vectorstore
 from datapizza.type import Chunk as DpChunk
+from pgvector import HalfVector
 from pgvector.django import CosineDistance
 
-from src.core.models import CVDocument, Chunk
+from src.core.models import FULL_TEXT_CONFIG, CVDocument, Chunk
 
 env = environ.Env()
 
+# ts_rank weights ordered {D, C, B, A}; raw text is stored with label A, metadata with label B.
+_DEFAULT_RANK_WEIGHTS = [0.1, 0.2, 1.0, 1.0]
+_RANK_WEIGHTS = {
+    "skill": _DEFAULT_RANK_WEIGHTS,
+    "experience": [0.1, 0.2, 0.4, 1.0],
+    "education": [0.1, 0.2, 1.0, 0.4],
+}
+
+
 class PgVectorStore(Vectorstore):
     """Vectorstore implementation backed by PostgreSQL + pgvector."""
 
     DEFAULT_DIMENSIONS = env.int("EMBEDDING_DIM", 1536)
+    BULK_BATCH_SIZE = 500
+    MIN_EF_SEARCH = 40
+    # pgvector rejects hnsw.ef_search above 1000.
+    MAX_EF_SEARCH = 1000
+    UPSERT_FIELDS = [
+        "document_id",
+        "chunk_index",
+        "text_chunk",
+        "embedding",
+        "metadata",
+        "updated_at",
+    ]
 
     def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
         super().__init__()
@@ -28,6 +50,31 @@ class PgVectorStore(Vectorstore):
                 f"Invalid embedding dimension {len(vector)}, expected {self.dimensions}"
             )
 
+    def _set_ef_search(self, k: int) -> None:
+        """Widen the HNSW candidate list for the current transaction so recall holds for large k."""
+        with connection.cursor() as cursor:
+            ef_search = min(max(k * 4, self.MIN_EF_SEARCH), self.MAX_EF_SEARCH)
+            cursor.execute("SET LOCAL hnsw.ef_search = %s", [ef_search])
+
+    def _build_rows(self, chunks: list[DpChunk]) -> list[Chunk]:
+        rows: list[Chunk] = []
+        for i, c in enumerate(chunks):
+            if not c.embeddings:
+                continue
+            vec = c.embeddings[0].vector
+            self._validate_embedding(vec)
+            rows.append(
+                Chunk(
+                    id=c.id,
+                    document_id=c.metadata.get("document_id"),
+                    chunk_index=i,
+                    text_chunk=c.text,
+                    embedding=vec,
+                    metadata=c.metadata or {},
+                )
+            )
+        return rows
+
     @transaction.atomic
     def add(self, chunk: DpChunk | list[DpChunk], collection_name: str | None = None):
         """
@@ -36,27 +83,27 @@ class PgVectorStore(Vectorstore):
         """
         chunks = chunk if isinstance(chunk, list) else [chunk]
 
-        for i, c in enumerate(chunks):
-            if not c.embeddings:
-                continue
-            vec = c.embeddings[0].vector
-            self._validate_embedding(vec)
-            Chunk.objects.update_or_create(
-                id=c.id,
-                defaults={
-                    "document_id": c.metadata.get("document_id"),
-                    "chunk_index": i,
-                    "text_chunk": c.text,
-                    "embedding": vec,
-                    "metadata": c.metadata or {},
-                },
-            )
+        # One multi-row INSERT ... ON CONFLICT per batch instead of SELECT + write per chunk.
+        Chunk.objects.bulk_create(
+            self._build_rows(chunks),
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=self.UPSERT_FIELDS,
+            batch_size=self.BULK_BATCH_SIZE,
+        )
 
         return len(chunks)
 
     async def a_add(self, chunk: DpChunk | list[DpChunk], collection_name: str | None = None):
-        # Async interface delegates to sync DB implementation.
-        return self.add(chunk, collection_name)
+        chunks = chunk if isinstance(chunk, list) else [chunk]
+        await Chunk.objects.abulk_create(
+            self._build_rows(chunks),
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=self.UPSERT_FIELDS,
+            batch_size=self.BULK_BATCH_SIZE,
+        )
+        return len(chunks)
 
     def update(
         self,
@@ -66,9 +113,7 @@ class PgVectorStore(Vectorstore):
         **kwargs,
     ):
         """Update existing chunk rows by ids."""
-        for pid in points:
-            Chunk.objects.filter(id=pid).update(**payload)
-        return len(points)
+        return Chunk.objects.filter(id__in=points).update(**payload)
 
     def remove(
         self,
@@ -92,30 +137,72 @@ class PgVectorStore(Vectorstore):
         self._validate_embedding(query_vector)
 
         qs = Chunk.objects.all()
-        hits = (
-            qs.annotate(distance=CosineDistance("embedding", query_vector))
-            .order_by("distance")[:k]
-            .values("id", "document_id", "chunk_index", "text_chunk", "metadata", "distance")
-        )
-
-        results: list[DpChunk] = []
-        for r in hits:
-            # pgvector returns distance; convert to similarity in [0, 1].
-            sim = max(0.0, 1.0 - float(r["distance"]))
-            metadata = r["metadata"] if "metadata" in r else {}
-            metadata["similarity"] = sim
-            metadata["document_id"] = str(r["document_id"])
-            results.append(
-                DpChunk(
-                    id=str(r["id"]),
-                    text=r["text_chunk"],
-                    embeddings=[],
-                    metadata=metadata,
-                )
+        with transaction.atomic():
+            self._set_ef_search(k)
+            hits = list(
+                qs.annotate(distance=CosineDistance("embedding", HalfVector(query_vector)))
+                .order_by("distance")[:k]
+                .values_list("id", "document_id", "text_chunk", "metadata", "distance")
             )
 
+        return [self._hit_to_chunk(*hit) for hit in hits]
+
+    def search_documents_multi(
+        self,
+        collection_name: str,
+        query_vectors: list[list[float]],
+        k: int = 10,
+    ) -> list[dict]:
+        """
+        One KNN search per query vector in a single statement, aggregated in SQL to the best
+        similarity per document. Returns one search_metadata-shaped payload per query vector:
+        {"retriever": [{"metadata": {"document_id": "...", "similarity": best}}, ...]}
+        """
+        if not query_vectors:
+            return []
+        for vector in query_vectors:
+            self._validate_embedding(vector)
+
+        # LATERAL runs an index-backed ORDER BY ... LIMIT per vector, sharing one round-trip.
+        sql = f"""
+            SELECT q.idx, c.document_id, GREATEST(0, 1 - MIN(c.distance)) AS similarity
+            FROM unnest(%s::halfvec[]) WITH ORDINALITY AS q(vec, idx)
+            CROSS JOIN LATERAL (
+                SELECT document_id, embedding <=> q.vec AS distance
+                FROM {Chunk._meta.db_table}
+                ORDER BY embedding <=> q.vec
+                LIMIT %s
+            ) AS c
+            GROUP BY q.idx, c.document_id
+            ORDER BY q.idx, similarity DESC
+        """
+        with transaction.atomic():
+            self._set_ef_search(k)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [[HalfVector(v).to_text() for v in query_vectors], k])
+                rows = cursor.fetchall()
+
+        results: list[dict] = [{"retriever": []} for _ in query_vectors]
+        for idx, document_id, similarity in rows:
+            results[idx - 1]["retriever"].append(
+                {"metadata": {"document_id": str(document_id), "similarity": float(similarity)}}
+            )
         return results
 
+    @staticmethod
+    def _hit_to_chunk(chunk_id, document_id, text_chunk, metadata, distance) -> DpChunk:
+        # pgvector returns distance; convert to similarity in [0, 1].
+        return DpChunk(
+            id=str(chunk_id),
+            text=text_chunk,
+            embeddings=[],
+            metadata={
+                **(metadata or {}),
+                "similarity": max(0.0, 1.0 - float(distance)),
+                "document_id": str(document_id),
+            },
+        )
+
     async def a_search(
         self,
         collection_name: str,
@@ -124,8 +211,11 @@ class PgVectorStore(Vectorstore):
         vector_name: str | None = None,
         **kwargs,
     ) -> list[DpChunk]:
-        # Async interface delegates to sync DB implementation.
-        return self.search(collection_name, query_vector, k, vector_name, **kwargs)
+        # SET LOCAL hnsw.ef_search needs a transaction, which the async ORM cannot open yet,
+        # so the query runs on Django's sync DB thread without blocking the event loop.
+        return await sync_to_async(self.search)(
+            collection_name, query_vector, k, vector_name, **kwargs
+        )
 
     def retrieve(self, collection_name: str, ids: list[str], **kwargs) -> list[DpChunk]:
         """Retrieve chunks by ids."""
@@ -134,9 +224,24 @@ class PgVectorStore(Vectorstore):
             DpChunk(
                 id=str(r["id"]), text=r["text_chunk"], embeddings=[], metadata=r["metadata"] or {}
             )
-            for r in dbrows
+            for r in dbrows.iterator(chunk_size=self.BULK_BATCH_SIZE)
         ]
 
+    @staticmethod
+    def _search_metadata_rows(query: str, category: str, k: int):
+        query_obj = SearchQuery(query, search_type="plain", config=FULL_TEXT_CONFIG)
+        rank_weights = _RANK_WEIGHTS.get(category, _DEFAULT_RANK_WEIGHTS)
+
+        return (
+            CVDocument.objects.filter(search_vector=query_obj)
+            .annotate(
+                rank=SearchRank(F("search_vector"), query_obj, weights=rank_weights),
+                category=Value(category, output_field=CharField()),
+            )
+            .order_by("-rank")[: max(1, int(k))]
+            .values("id", "rank", "category")
+        )
+
     @staticmethod
     def search_metadata(query: str, category: str, k: int = 10) -> dict:
         """
@@ -148,29 +253,29 @@ class PgVectorStore(Vectorstore):
         if not q:
             return {"retriever": []}
 
-        query_obj = SearchQuery(q, search_type="plain")
-        text_expr = Coalesce("raw_text", Value(""), output_field=TextField())
-        metadata_expr = Coalesce(Cast("metadata", TextField()), Value(""), output_field=TextField())
-
-        if category == "skill":
-            vector = SearchVector(text_expr, weight="A") + SearchVector(metadata_expr, weight="A")
-        elif category == "experience":
-            vector = SearchVector(text_expr, weight="A") + SearchVector(metadata_expr, weight="B")
-        elif category == "education":
-            vector = SearchVector(text_expr, weight="B") + SearchVector(metadata_expr, weight="A")
-        else:
-            vector = SearchVector(text_expr, weight="A") + SearchVector(metadata_expr, weight="A")
-
-        rows = (
-            CVDocument.objects.annotate(search=vector)
-            .annotate(rank=SearchRank(vector, query_obj))
-            .filter(rank__gt=0.0)
-            .order_by("-rank")[: max(1, int(k))]
-            .values("id", "rank")
-        )
-
         retriever = [
             {"metadata": {"document_id": str(r["id"]), "similarity": float(r["rank"])}}
-            for r in rows
+            for r in PgVectorStore._search_metadata_rows(q, category, k)
         ]
         return {"retriever": retriever}
+
+    @staticmethod
+    def search_metadata_multi(pairs: list[tuple[str, str]], k: int = 10) -> dict[str, dict]:
+        """
+        search_metadata for several (category, query) pairs as one UNION ALL statement.
+        Returns {category: {"retriever": [...]}} with one entry per pair.
+        """
+        out: dict[str, dict] = {category: {"retriever": []} for category, _ in pairs}
+        querysets = [
+            PgVectorStore._search_metadata_rows(query.strip(), category, k)
+            for category, query in pairs
+            if (query or "").strip()
+        ]
+        if not querysets:
+            return out
+
+        for r in querysets[0].union(*querysets[1:], all=True):
+            out[r["category"]]["retriever"].append(
+                {"metadata": {"document_id": str(r["id"]), "similarity": float(r["rank"])}}
+            )
+        return out
@@ -11,6 +11,15 @@ from src.core.models import JobDescription
 env = environ.Env()
 
 
+JOB_SPLIT_SYSTEM_PROMPT = (
+    "Extract search-focused fields from the job offer. "
+    "Return short query strings: skill, education, experience. "
+    "For skill, prefer concrete technical/domain terms (e.g. backend python fastapi), "
+    "not only generic words like 'engineer'. "
+    "Do not invent requirements not present in the input."
+)
+
+
 class JobProposalSplit(BaseModel):
     skill: str = Field(default="")
     education: str = Field(default="")
@@ -20,6 +29,8 @@ class JobProposalSplit(BaseModel):
 class JobDescriptionIngestionJob:
     """Split a job description by category, embed each section, and persist the row."""
 
+    EMBED_BATCH_SIZE = 256
+
     def __init__(self):
         api_key = env.str("OPENAI_API_KEY", default=env.str("OPENAIE_API_KEY", default=""))
         if not api_key:
@@ -34,17 +45,18 @@ class JobDescriptionIngestionJob:
         response = self.client.structured_response(
             input=job_offer_text,
             output_cls=JobProposalSplit,
-            system_prompt=(
-                "Extract search-focused fields from the job offer. "
-                "Return short query strings: skill, education, experience. "
-                "For skill, prefer concrete technical/domain terms (e.g. backend python fastapi), "
-                "not only generic words like 'engineer'. "
-                "Do not invent requirements not present in the input."
-            ),
+            system_prompt=JOB_SPLIT_SYSTEM_PROMPT,
         )
         # datapizza currently types structured_data as BaseModel; runtime is JobProposalSplit.
         return cast(JobProposalSplit, response.structured_data[0])
 
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Embed many texts with one embeddings request per `EMBED_BATCH_SIZE` inputs."""
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), self.EMBED_BATCH_SIZE):
+            vectors.extend(self.embedder.embed(texts[start : start + self.EMBED_BATCH_SIZE]))
+        return vectors
+
     @staticmethod
     def _normalize_text(value: str, fallback: str) -> str:
         text = (value or "").strip()
@@ -57,9 +69,9 @@ class JobDescriptionIngestionJob:
         education_text = self._normalize_text(split.education, job_offer_text)
         experience_text = self._normalize_text(split.experience, job_offer_text)
 
-        skill_embedding = self.embedder.embed(skill_text)
-        education_embedding = self.embedder.embed(education_text)
-        experience_embedding = self.embedder.embed(experience_text)
+        skill_embedding, education_embedding, experience_embedding = self.embed_batch(
+            [skill_text, education_text, experience_text]
+        )
 
         return JobDescription.objects.create(
             text=job_offer_text,
@@ -1,3 +1,4 @@
+import functools
 import json
 from pathlib import Path
 from typing import Any
@@ -15,6 +16,11 @@ from src.core.models import CVDocument
 
 env = environ.Env()
 
+# Static system prompt, read once per process so every call sends an identical cacheable prefix.
+CV_EXTRACTION_PROMPT = (
+    Path(__file__).with_name("prompts").joinpath("cv_extract.md").read_text(encoding="utf-8")
+)
+
 
 class CVIngestionPipeline(IngestionPipeline):
     """Pipeline that extracts CV text/metadata, converts text into chunks, embeds them, and stores them."""
@@ -40,22 +46,13 @@ class CVIngestionPipeline(IngestionPipeline):
 
     @staticmethod
     def _parse_extraction_response(raw_text: str) -> dict[str, Any]:
-        full_text_marker = "FULL_TEXT:"
-        metadata_marker = "METADATA_JSON:"
         metadata: dict[str, Any] = {}
 
-        full_text_index = raw_text.find(full_text_marker)
-        metadata_index = raw_text.find(metadata_marker)
-
-        if full_text_index != -1:
-            full_start = full_text_index + len(full_text_marker)
-            full_end = metadata_index if metadata_index != -1 else len(raw_text)
-            full_text = raw_text[full_start:full_end].strip()
-        else:
-            full_text = raw_text.strip()
+        head, metadata_marker, metadata_raw = raw_text.partition("METADATA_JSON:")
+        _, full_text_marker, full_text = head.partition("FULL_TEXT:")
+        full_text = full_text.strip() if full_text_marker else raw_text.strip()
 
-        if metadata_index != -1:
-            metadata_raw = raw_text[metadata_index + len(metadata_marker) :].strip()
+        if metadata_marker:
             try:
                 parsed_metadata = json.loads(metadata_raw)
                 if isinstance(parsed_metadata, dict):
@@ -69,142 +66,23 @@ class CVIngestionPipeline(IngestionPipeline):
         pdf_doc = Media(media_type="pdf", source_type="path", source=pdf_path, extension="pdf")
 
         response = self.client.invoke(
-            system_prompt="""
-
-                You are an assistant specialized in CV/Resume PDF analysis. You will receive as input the extracted text content from a PDF CV (or raw text obtained via a PDF extraction tool).
-
-Your tasks are:
-1) Return ALL the text from the PDF faithfully and completely (do NOT summarize).
-2) Extract structured metadata and produce a valid JSON object containing: skills, education, and seniority (plus related relevant CV fields).
-
-GENERAL RULES (MANDATORY)
-- Do NOT hallucinate or invent information. If a field is not explicitly present or cannot be inferred with high confidence, use null or an empty array.
-- Do NOT add content that does not appear in the CV.
-- If the CV contains multiple columns, reconstruct the most natural reading order (top-to-bottom, left-to-right).
-- Remove obvious noise (e.g., repeated headers/footers, page numbers) ONLY in the JSON interpretation if needed; NEVER remove anything from the full extracted text.
-- Preserve the original language of the CV in both FULL_TEXT and JSON values (except for enumerated fields like seniority.level).
-- Always output in two sections: FULL_TEXT first, then METADATA_JSON.
-- The JSON must be strictly valid (double quotes, no comments, no trailing commas).
-
-OUTPUT FORMAT
-
-1) First write:
-
-FULL_TEXT:
-<complete CV text>
-
-2) Then write:
-
-METADATA_JSON:
-<valid JSON object>
-
-FULL_TEXT REQUIREMENTS
-- Return the complete CV text exactly as extracted.
-- Preserve line breaks and section separations where possible.
-- Preserve bullet points using "-" or "•".
-- If tables are present, serialize them into readable rows (e.g., using " | " as separator).
-- Do NOT summarize or clean the text.
-
-METADATA_JSON SCHEMA
-
-Use the following structure:
-
-{
-  "candidate_name": string|null,
-  "contact": {
-    "email": string|null,
-    "phone": string|null,
-    "location": string|null,
-    "links": [string]
-  },
-  "seniority": {
-    "level": "intern"|"junior"|"mid"|"senior"|"staff"|"principal"|"lead"|"manager"|"director"|"executive"|null,
-    "years_experience_estimate": number|null,
-    "rationale": string|null
-  },
-  "skills": {
-    "hard_skills": [string],
-    "soft_skills": [string],
-    "tools_technologies": [string],
-    "languages": [
-      { "language": string, "proficiency": string|null }
-    ],
-    "certifications": [string]
-  },
-  "education": [
-    {
-      "degree": string|null,
-      "field": string|null,
-      "institution": string|null,
-      "location": string|null,
-      "start_date": string|null,
-      "end_date": string|null,
-      "grade": string|null,
-      "notes": string|null
-    }
-  ],
-  "experience_summary": {
-    "current_title": string|null,
-    "current_company": string|null,
-    "industries": [string],
-    "top_roles": [string]
-  },
-  "extraction_quality": {
-    "is_text_complete": boolean,
-    "suspected_columns_or_tables": boolean,
-    "missing_sections_guess": [string],
-    "notes": string
-  }
-}
-
-SKILLS GUIDELINES
-- hard_skills: domain or technical competencies (e.g., “Machine Learning”, “Accounting”, “Java”).
-- tools_technologies: specific tools, platforms, frameworks, software (e.g., “AWS”, “Docker”, “SAP”, “Excel”, “Kubernetes”).
-- soft_skills: include ONLY if explicitly stated or clearly described (e.g., “teamwork”, “leadership”, “public speaking”).
-- languages: human languages only (e.g., English, Italian) with proficiency level if stated (e.g., B2, fluent, native).
-- certifications: official certifications explicitly mentioned.
-
-EDUCATION GUIDELINES
-- Create one object per relevant degree.
-- Normalize dates to ISO format:
-  - "YYYY-MM" if month available
-  - "YYYY" if only year available
-  - null if missing
-- If marked as "Ongoing" or "In progress", set end_date = null and explain in notes.
-
-SENIORITY GUIDELINES
-- If total years of experience are explicitly mentioned, use them.
-- If not explicit, estimate from employment timeline only if clearly reconstructable.
-- level mapping guidance:
-  - intern: mostly internships/traineeships
-  - junior: ~0–2 years or entry-level roles
-  - mid: ~2–5 years
-  - senior: ~5–8+ years or advanced responsibilities
-  - staff/principal: high technical leadership across teams
-  - lead/manager/director/executive: only if explicitly stated in the CV
-- rationale: short explanation referencing textual evidence (no fabrication).
-
-QUALITY CHECK
-- The JSON must always be present, even if mostly empty.
-- If a section is missing, use empty arrays and null values appropriately.
-- extraction_quality.is_text_complete = true only if the CV appears complete (contact, experience, education present) and no clear truncation signals exist.
-- Do not include personal data that is not explicitly present in the CV.
-
-EXAMPLE STRUCTURE (structure only, not content):
-
-FULL_TEXT:
-...
-
-METADATA_JSON:
-
-               """,
+            system_prompt=CV_EXTRACTION_PROMPT,
             input=[MediaBlock(media=pdf_doc)],
             max_tokens=3000,
         )
         return self._parse_extraction_response(getattr(response, "text", "") or "")
 
     def ingest_cv_document(self, document) -> CVDocument:
-        extracted = self.extract_metadata(document.source_file.path)
+        if document.raw_text:
+            # A previous attempt already extracted this file; a retry only redoes chunking
+            # and embedding.
+            extracted = {"text": document.raw_text, "metadata": document.metadata or {}}
+        else:
+            extracted = self.extract_metadata(document.source_file.path)
+            CVDocument.objects.filter(id=document.id).update(
+                raw_text=extracted.get("text", "") or "",
+                metadata=extracted.get("metadata", {}) or {},
+            )
         chunks = super().run(extracted.get("text", ""), metadata=extracted.get("metadata", {}))
         if not isinstance(chunks, list) or not all(isinstance(chunk, DPChunk) for chunk in chunks):
             raise ValueError("Ingestion pipeline output must be a list of Chunk objects")
@@ -232,3 +110,9 @@ METADATA_JSON:
             chunk.metadata["document_id"] = str(document.id)
         self.db_vector_store.add(chunks)
         return document
+
+
+@functools.cache
+def get_ingestion_pipeline() -> CVIngestionPipeline:
+    """Return the process-wide CVIngestionPipeline so clients and config load once per worker."""
+    return CVIngestionPipeline()
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-15 09:12
+
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_alter_searchrun_options_searchrun_job_description_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chunk",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="chunk_embed_hnsw",
+                opclasses=["vector_cosine_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-15 09:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_chunk_embed_hnsw"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="cvdocument",
+            index=models.Index(fields=["-created_at"], name="cvdoc_created_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cvdocument",
+            index=models.Index(fields=["-ingested_at"], name="cvdoc_ingested_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="cvdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("candidate_name"),
+                    name="gin_trgm_ops",
+                ),
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"),
+                    name="gin_trgm_ops",
+                ),
+                name="cvdoc_name_email_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="uploaditem",
+            index=models.Index(fields=["batch", "status"], name="uploaditem_batch_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="uploaditem",
+            index=models.Index(fields=["created_at"], name="uploaditem_created_at_idx"),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-15 10:05
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_admin_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cvdocument",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "raw_text", config="english", weight="A"
+                )
+                + django.contrib.postgres.search.SearchVector(
+                    "metadata", config="english", weight="B"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cvdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="cvdoc_search_vector_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-15 10:48
+
+import pgvector.django.halfvec
+import pgvector.django.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_cvdocument_search_vector"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="chunk",
+            name="chunk_embed_hnsw",
+        ),
+        migrations.AlterField(
+            model_name="chunk",
+            name="embedding",
+            field=pgvector.django.halfvec.HalfVectorField(dimensions=1536),
+        ),
+        migrations.AddIndex(
+            model_name="chunk",
+            index=pgvector.django.indexes.HnswIndex(
+                ef_construction=64,
+                fields=["embedding"],
+                m=16,
+                name="chunk_embed_hnsw",
+                opclasses=["halfvec_cosine_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-15 11:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_chunk_embedding_halfvec"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="chunk",
+            options={},
+        ),
+    ]
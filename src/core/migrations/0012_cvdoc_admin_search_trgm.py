@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-15 23:05
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_alter_chunk_options"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="cvdocument",
+            name="cvdoc_name_email_trgm",
+        ),
+        migrations.AddIndex(
+            model_name="cvdocument",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("candidate_name"),
+                    name="gin_trgm_ops",
+                ),
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("email"),
+                    name="gin_trgm_ops",
+                ),
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("source_checksum"),
+                    name="gin_trgm_ops",
+                ),
+                name="cvdoc_admin_search_trgm",
+            ),
+        ),
+    ]
@@ -4,8 +4,14 @@ from __future__ import annotations
 
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from pgvector.django import VectorField
+from django.db.models.functions import Upper
+from pgvector.django import HalfVectorField, HnswIndex, VectorField
+
+# Text search configuration shared by the stored search vector and the queries against it.
+FULL_TEXT_CONFIG = "english"
 
 
 class CVDocument(models.Model):
@@ -21,9 +27,29 @@ class CVDocument(models.Model):
     ingested_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Raw text is labelled A and metadata B; search_metadata re-weights the labels per category.
+    search_vector = models.GeneratedField(
+        expression=SearchVector("raw_text", weight="A", config=FULL_TEXT_CONFIG)
+        + SearchVector("metadata", weight="B", config=FULL_TEXT_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="cvdoc_created_at_idx"),
+            models.Index(fields=["-ingested_at"], name="cvdoc_ingested_at_idx"),
+            # Admin search ORs UPPER(col) LIKE UPPER('%term%') over every search field;
+            # trigram ops on all of them let Postgres answer it with one bitmap index scan.
+            GinIndex(
+                OpClass(Upper("candidate_name"), name="gin_trgm_ops"),
+                OpClass(Upper("email"), name="gin_trgm_ops"),
+                OpClass(Upper("source_checksum"), name="gin_trgm_ops"),
+                name="cvdoc_admin_search_trgm",
+            ),
+            GinIndex(fields=["search_vector"], name="cvdoc_search_vector_gin"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.candidate_name} ({self.id})"
@@ -80,6 +106,10 @@ class UploadItem(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["batch", "status"], name="uploaditem_batch_status_idx"),
+            models.Index(fields=["created_at"], name="uploaditem_created_at_idx"),
+        ]
 
 
 class Chunk(models.Model):
@@ -89,13 +119,21 @@ class Chunk(models.Model):
     document = models.ForeignKey(CVDocument, on_delete=models.CASCADE, related_name="chunks")
     chunk_index = models.PositiveIntegerField()
     text_chunk = models.TextField()
-    embedding = VectorField(dimensions=1536)
+    embedding = HalfVectorField(dimensions=1536)
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["id"]
+        indexes = [
+            HnswIndex(
+                name="chunk_embed_hnsw",
+                fields=["embedding"],
+                m=16,
+                ef_construction=64,
+                opclasses=["halfvec_cosine_ops"],
+            ),
+        ]
 
 
 class SearchRun(models.Model):
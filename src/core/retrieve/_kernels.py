@@ -0,0 +1,72 @@
+"""Numeric kernels for candidate scoring."""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional JIT; the NumPy implementation is used instead
+    numba = None
+
+
+def min_max_normalize(arr: np.ndarray) -> np.ndarray:
+    """Min-max normalize each column of an (N, M) matrix to [0, 1]."""
+    mins = arr.min(axis=0)
+    spans = arr.max(axis=0) - mins
+    # Columns where every row has the same value collapse to 0.
+    return np.divide(arr - mins, spans, out=np.zeros_like(arr), where=spans > 0)
+
+
+def _score_numpy(
+    semantic: np.ndarray,
+    metadata: np.ndarray,
+    exp_meta: np.ndarray,
+    blend_experience: bool,
+    exp_idx: int,
+    weights: np.ndarray,
+) -> np.ndarray:
+    merged = (semantic + metadata) / 2.0
+    if blend_experience:
+        merged[:, exp_idx] = (merged[:, exp_idx] + exp_meta) / 2.0
+    return min_max_normalize(merged) @ weights
+
+
+def _score_loop(
+    semantic: np.ndarray,
+    metadata: np.ndarray,
+    exp_meta: np.ndarray,
+    blend_experience: bool,
+    exp_idx: int,
+    weights: np.ndarray,
+) -> np.ndarray:
+    n, m = semantic.shape
+    merged = np.empty((n, m))
+    mins = np.full(m, np.inf)
+    maxs = np.full(m, -np.inf)
+    for i in range(n):
+        for j in range(m):
+            value = (semantic[i, j] + metadata[i, j]) / 2.0
+            if blend_experience and j == exp_idx:
+                value = (value + exp_meta[i]) / 2.0
+            merged[i, j] = value
+            mins[j] = min(mins[j], value)
+            maxs[j] = max(maxs[j], value)
+
+    out = np.zeros(n)
+    for i in range(n):
+        score = 0.0
+        for j in range(m):
+            span = maxs[j] - mins[j]
+            if span > 0:
+                score += weights[j] * (merged[i, j] - mins[j]) / span
+        out[i] = score
+    return out
+
+
+if numba is not None:
+    score_kernel = numba.njit(cache=True)(_score_loop)
+    # Compile at import so the first request does not pay the JIT cost.
+    score_kernel(np.zeros((1, 3)), np.zeros((1, 3)), np.zeros(1), True, 2, np.ones(3))
+else:
+    score_kernel = _score_numpy
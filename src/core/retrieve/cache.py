@@ -0,0 +1,63 @@
+"""In-process caches for query embeddings and retrieval results."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Any
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with an optional time-to-live (in seconds) per entry."""
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def embedding_key(text: str, model_name: str) -> tuple[bytes, str]:
+    """Key a text by the SHA-256 of its whitespace-normalized form plus the embedding model."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode()).digest(), model_name
+
+
+def retrieval_key(vector: Sequence[float], k: int, collection_name: str) -> tuple[bytes, int, str]:
+    return array("d", vector).tobytes(), k, collection_name
+
+
+EMBEDDING_CACHE = LRUCache(maxsize=4096)
+# Retrieval hits go stale as new CVs are ingested, so they expire after a few minutes.
+RETRIEVAL_CACHE = LRUCache(maxsize=1024, ttl=300)
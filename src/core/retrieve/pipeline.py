@@ -1,26 +1,22 @@
+import heapq
+import math
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import StrEnum
 from typing import Any, Callable, cast
 
 import environ
+import numpy as np
 from datapizza.clients.openai import OpenAIClient
-from pydantic import BaseModel, Field
 
-from src.core.db import PgVectorStore
+from src.core.inject.inject_job_description import JOB_SPLIT_SYSTEM_PROMPT, JobProposalSplit
 from src.core.models import CVDocument, JobDescription
-from src.core.retrieve.rag import RagPipeline
+from src.core.retrieve._kernels import score_kernel
+from src.core.retrieve.rag import get_rag_pipeline
 
 env = environ.Env()
 API_KEY = env("OPENAI_API_KEY", default="")
 
 
-class JobProposalSplit(BaseModel):
-    skill: str = Field(default="")
-    education: str = Field(default="")
-    experience: str = Field(default="")
-
-
 class Category(StrEnum):
     SKILL = "skill"
     EDUCATION = "education"
@@ -28,22 +24,30 @@ class Category(StrEnum):
 
 
 CATEGORIES = (Category.SKILL.value, Category.EDUCATION.value, Category.EXPERIENCE.value)
+_EXPERIENCE_IDX = CATEGORIES.index(Category.EXPERIENCE.value)
+
+
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+# Checked in this order: "no more than" must win over "more than".
+_MAX_KW_RE = re.compile(r"less than|under|max|up to|no more than")
+_MIN_KW_RE = re.compile(r"more than|at least|over")
+_RANGE_KW_RE = re.compile(r"-| to |between|from")
 
 
 def _parse_experience_constraints(experience_query: str) -> tuple[float | None, float | None]:
     """Extract soft min/max years constraints from natural language."""
     q = (experience_query or "").lower()
-    nums = [float(n) for n in re.findall(r"\d+(?:\.\d+)?", q)]
+    if not q:
+        return None, None
+    nums = [float(n) for n in _NUM_RE.findall(q)]
     if not nums:
         return None, None
 
-    if "less than" in q or "under" in q or "max" in q or "up to" in q or "no more than" in q:
+    if _MAX_KW_RE.search(q):
         return None, nums[0]
-    if "more than" in q or "at least" in q or "over" in q:
-        return nums[0], None
-    if "+" in q:
+    if _MIN_KW_RE.search(q) or "+" in q:
         return nums[0], None
-    if len(nums) >= 2 and ("-" in q or " to " in q or "between" in q or "from" in q):
+    if len(nums) >= 2 and _RANGE_KW_RE.search(q):
         low = min(nums[0], nums[1])
         high = max(nums[0], nums[1])
         return low, high
@@ -91,100 +95,107 @@ def _score_years_against_constraints(
     return 1.0 if y <= high else max(0.0, high / y) if high and y > 0 else 0.0
 
 
-def compute_experience_metadata_score(job_details: JobProposalSplit) -> dict[str, float]:
-    """Compute soft experience score from metadata.seniority.years_experience_estimate."""
+def compute_experience_metadata_score(
+    job_details: JobProposalSplit,
+    doc_ids: list[str] | None = None,
+) -> dict[str, float]:
+    """Compute soft experience score from metadata.seniority.years_experience_estimate.
+
+    When doc_ids is given only those CVs are scored.
+    """
     min_years, max_years = _parse_experience_constraints(job_details.experience)
     if min_years is None and max_years is None:
         min_years, max_years = _fallback_seniority_range(job_details.experience)
     if min_years is None and max_years is None:
         return {}
 
+    qs = CVDocument.objects.all()
+    if doc_ids is not None:
+        qs = qs.filter(id__in=doc_ids)
+
     out: dict[str, float] = {}
-    for doc in CVDocument.objects.only("id", "metadata"):
-        metadata = doc.metadata if isinstance(doc.metadata, dict) else {}
-        seniority = metadata.get("seniority", {}) if isinstance(metadata, dict) else {}
-        years = seniority.get("years_experience_estimate")
+    for doc_id, years in qs.values_list("id", "metadata__seniority__years_experience_estimate"):
         try:
             years_f = float(years)
         except (TypeError, ValueError):
             years_f = 0.0
-        out[str(doc.id)] = _score_years_against_constraints(years_f, min_years, max_years)
+        out[str(doc_id)] = _score_years_against_constraints(years_f, min_years, max_years)
     return out
 
 
-def apply_experience_metadata_boost(
-    occ: dict[str, dict[str, float]],
-    exp_meta_scores: dict[str, float],
-) -> dict[str, dict[str, float]]:
-    """Blend retrieval experience signal and metadata experience signal with equal weight."""
-    if not exp_meta_scores:
-        return occ
-
-    out: dict[str, dict[str, float]] = {}
-    for doc_id, values in occ.items():
-        retrieval_exp = float(values.get(Category.EXPERIENCE.value, 0.0))
-        metadata_exp = float(exp_meta_scores.get(doc_id, 0.0))
-        out[doc_id] = dict(values)
-        out[doc_id][Category.EXPERIENCE.value] = (retrieval_exp + metadata_exp) / 2.0
-    return out
-
-
-def normalize_occurrences(occ: dict[str, dict[str, float]]) -> dict[str, dict[str, float]]:
-    """Min-max normalize each category to [0,1] across all candidates."""
-    categories = CATEGORIES
-    if not occ:
-        return occ
-
-    mins = {category: float("inf") for category in categories}
-    maxs = {category: float("-inf") for category in categories}
-
-    for values in occ.values():
-        for category in categories:
-            value = float(values.get(category, 0.0))
-            mins[category] = min(mins[category], value)
-            maxs[category] = max(maxs[category], value)
-
-    normalized: dict[str, dict[str, float]] = {}
-    for doc_id, values in occ.items():
-        normalized[doc_id] = {}
-        for category in categories:
-            value = float(values.get(category, 0.0))
-            low = mins[category]
-            high = maxs[category]
-            if high <= low:
-                normalized[doc_id][category] = 0.0
-            else:
-                normalized[doc_id][category] = (value - low) / (high - low)
+def _stack_occurrences(occ: dict[str, dict[str, float]], doc_ids: list[str]) -> np.ndarray:
+    """Return an (N, 3) matrix of per-category scores, rows aligned with doc_ids."""
+    return np.array(
+        [
+            [occ.get(doc_id, {}).get(category, 0.0) for category in CATEGORIES]
+            for doc_id in doc_ids
+        ],
+        dtype=np.float64,
+    ).reshape(len(doc_ids), len(CATEGORIES))
 
-    return normalized
 
-
-def calculate_score(
-    doc_id: str,
-    categories: dict[str, float],
+def score_occurrences(
+    doc_ids: list[str],
+    semantic_occ: dict[str, dict[str, float]],
+    metadata_occ: dict[str, dict[str, float]],
+    exp_meta_scores: dict[str, float],
     weights: dict[str, float],
-    cv_lookup: dict[str, CVDocument],
+) -> np.ndarray:
+    """Merge, boost, normalize and weight category scores over one (N, 3) matrix.
+
+    Returns one weighted score per candidate, aligned with doc_ids.
+    """
+    if not doc_ids:
+        return np.zeros(0, dtype=np.float64)
+
+    exp_meta = np.fromiter(
+        (float(exp_meta_scores.get(doc_id, 0.0)) for doc_id in doc_ids),
+        dtype=np.float64,
+        count=len(doc_ids),
+    )
+    weight_vec = np.array(
+        [float(weights.get(category, 0.0)) for category in CATEGORIES], dtype=np.float64
+    )
+    return score_kernel(
+        _stack_occurrences(semantic_occ, doc_ids),
+        _stack_occurrences(metadata_occ, doc_ids),
+        exp_meta,
+        bool(exp_meta_scores),
+        _EXPERIENCE_IDX,
+        weight_vec,
+    )
+
+
+def build_result_row(
+    doc_id: str,
+    score: float,
+    cv_lookup: dict[str, dict[str, Any]],
 ) -> dict[str, Any]:
-    """Compute weighted score for one CV from per-category similarity values."""
-    score = 0.0
-    for category_name, similarity in categories.items():
-        score += float(weights.get(category_name, 0.0)) * float(similarity)
+    """Build the response row for one CV from its weighted score.
 
+    cv_lookup maps document ids to CVDocument.values() rows; "cv" is filled in by the caller.
+    """
     cv = cv_lookup.get(doc_id)
     if cv is None:
         raise ValueError(f"CVDocument not found for id={doc_id}")
 
     return {
-        "cv_id": str(cv.id),
-        "candidate_name": cv.candidate_name,
-        "cv": cv.raw_text,
-        "candidate_email": cv.email,
+        "cv_id": str(cv["id"]),
+        "candidate_name": cv["candidate_name"],
+        "cv": "",
+        "candidate_email": cv["email"],
         "score": score,
     }
 
 
-def dedup_results_by_email(results: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Keep best-scored row per candidate_email (fallback candidate_name)."""
+def dedup_results_by_email(
+    results: list[dict[str, Any]],
+    top_k: int | None = None,
+) -> list[dict[str, Any]]:
+    """Keep best-scored row per candidate_email (fallback candidate_name), best first.
+
+    With top_k only the top_k rows are returned, selected without sorting every row.
+    """
     best: dict[str, dict[str, Any]] = {}
     for row in results:
         key = (row.get("candidate_email") or "").strip().lower() or (
@@ -195,14 +206,16 @@ def dedup_results_by_email(results: list[dict[str, Any]]) -> list[dict[str, Any]
         prev = best.get(key)
         if prev is None or float(row.get("score", 0.0)) > float(prev.get("score", 0.0)):
             best[key] = row
+    if top_k is not None:
+        return heapq.nlargest(top_k, best.values(), key=lambda x: x["score"])
     return sorted(best.values(), key=lambda x: x["score"], reverse=True)
 
 
 class CvScreenPipeline:
     def __init__(self, progress_step: Callable):
         self.client = OpenAIClient(model="gpt-4o-mini", api_key=API_KEY)
-        self.vector_store = PgVectorStore()
-        self.rag_pipeline = RagPipeline()
+        self.rag_pipeline = get_rag_pipeline()
+        self.vector_store = self.rag_pipeline.vector_store
         self.progress_step = progress_step
 
     @staticmethod
@@ -227,53 +240,21 @@ class CvScreenPipeline:
                     continue
                 doc_id = str(doc_id)
 
-                similarity = float(metadata.get("similarity", 0.0))
-                prev = best_by_doc.get(doc_id)
-                if prev is None or similarity > prev:
+                similarity = float(metadata.get("similarity") or 0.0)
+                if similarity > best_by_doc.get(doc_id, -math.inf):
                     best_by_doc[doc_id] = similarity
 
             return best_by_doc
 
         by_category = {category: _category_doc_similarities(category) for category in categories}
-        all_doc_ids: set[str] = set()
-        for category in categories:
-            all_doc_ids.update(by_category[category].keys())
-
+        all_doc_ids = set().union(*by_category.values())
         return {
-            doc_id: {
-                Category.SKILL.value: by_category[Category.SKILL.value].get(doc_id, 0.0),
-                Category.EDUCATION.value: by_category[Category.EDUCATION.value].get(doc_id, 0.0),
-                Category.EXPERIENCE.value: by_category[Category.EXPERIENCE.value].get(doc_id, 0.0),
-            }
+            doc_id: {category: by_category[category].get(doc_id, 0.0) for category in categories}
             for doc_id in all_doc_ids
         }
 
-    @staticmethod
-    def merge_occurrences(
-        semantic_occ: dict[str, dict[str, float]],
-        metadata_occ: dict[str, dict[str, float]],
-    ) -> dict[str, dict[str, float]]:
-        """Merge semantic and metadata occurrences with equal 50/50 contribution."""
-        categories = CATEGORIES
-        all_ids = set(semantic_occ.keys()) | set(metadata_occ.keys())
-        merged: dict[str, dict[str, float]] = {}
-        for doc_id in all_ids:
-            merged[doc_id] = {}
-            for category in categories:
-                semantic_score = float(semantic_occ.get(doc_id, {}).get(category, 0.0))
-                metadata_score = float(metadata_occ.get(doc_id, {}).get(category, 0.0))
-                merged[doc_id][category] = (semantic_score + metadata_score) / 2.0
-        return merged
-
-    def run_category_metadata_search(self, query: str, category: str, k: int) -> dict[str, Any]:
-        """Run category-specific metadata full-text search (ts_rank)."""
-        q = (query or "").strip()
-        if not q:
-            return {"retriever": []}
-        return self.vector_store.search_metadata(query=q, category=category, k=k)
-
     def compute_metadata(self, job_details: JobProposalSplit, k: int = 25) -> dict[str, Any]:
-        """Compute metadata-only retrieval for skill/education/experience in parallel."""
+        """Compute metadata-only retrieval for skill/education/experience in one query."""
         category_queries = {
             Category.SKILL.value: job_details.skill,
             Category.EDUCATION.value: job_details.education,
@@ -284,39 +265,19 @@ class CvScreenPipeline:
             Category.EDUCATION.value: {"retriever": []},
             Category.EXPERIENCE.value: {"retriever": []},
         }
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_map = {
-                executor.submit(self.run_category_metadata_search, query, category, k): category
-                for category, query in category_queries.items()
-            }
-            for future in as_completed(future_map):
-                category = future_map[future]
-                out[category] = future.result()
+        out.update(self.vector_store.search_metadata_multi(list(category_queries.items()), k=k))
         return out
 
-    def run_category_search(self, query: str, k: int) -> dict[str, Any]:
-        """Run one RAG retrieval for a single category query."""
-        print('category', query)
-        q = (query or "").strip()
-        if not q:
-            return {}
-
-        system_query = (
+    @staticmethod
+    def _category_system_query(query: str) -> str:
+        return (
             "Retrieve CVs relevant to this hiring query. "
             "Preserve important constraints in the wording, but do not apply hard filtering. "
-            f"Job request: {q}"
-        )
-        return self.rag_pipeline.run(
-            {
-                "rewriter": {"user_prompt": system_query},
-                "prompt": {"user_prompt": system_query},
-                "retriever": {"collection_name": "sample", "k": max(1, int(k))},
-                "retrieve_cvs": {"user_prompt": system_query},
-            }
+            f"Job request: {query}"
         )
 
     def semantic_search(self, job_details: JobProposalSplit, k: int = 25) -> dict[str, Any]:
-        """Run skill/education/experience searches in parallel and return grouped outputs."""
+        """Run skill/education/experience searches with one batched embedding request."""
         category_queries = {
             Category.SKILL.value: job_details.skill,
             Category.EDUCATION.value: job_details.education,
@@ -328,14 +289,20 @@ class CvScreenPipeline:
             Category.EDUCATION.value: {},
             Category.EXPERIENCE.value: {},
         }
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            future_map = {
-                executor.submit(self.run_category_search, query, k): category
-                for category, query in category_queries.items()
-            }
-            for future in as_completed(future_map):
-                category = future_map[future]
-                out[category] = future.result()
+        active = {
+            category: " ".join(query.split())
+            for category, query in category_queries.items()
+            if (query or "").strip()
+        }
+        # Categories that share the same query text share one retrieval.
+        unique_queries = list(dict.fromkeys(active.values()))
+        results = self.rag_pipeline.run_batch(
+            [self._category_system_query(query) for query in unique_queries],
+            k=max(1, int(k)),
+        )
+        by_query = dict(zip(unique_queries, results))
+        for category, query in active.items():
+            out[category] = by_query[query]
 
         return out
 
@@ -344,13 +311,7 @@ class CvScreenPipeline:
         response = self.client.structured_response(
             input=job_offer_text,
             output_cls=JobProposalSplit,
-            system_prompt=(
-                "Extract search-focused fields from the job offer. "
-                "Return short query strings: skill, education, experience. "
-                "For skill, prefer concrete technical/domain terms (e.g. backend python fastapi), "
-                "not only generic words like 'engineer'. "
-                "Do not invent requirements not present in the input."
-            ),
+            system_prompt=JOB_SPLIT_SYSTEM_PROMPT,
         )
         # datapizza currently types structured_data as BaseModel; runtime is JobProposalSplit.
         return cast(JobProposalSplit, response.structured_data[0])
@@ -389,27 +350,35 @@ class CvScreenPipeline:
         self.progress_step("merge", False, f"Merge dei risultati precedenti")
         semantic_occ = self.find_occurrences(semantic_result)
         metadata_occ = self.find_occurrences(metadata_result)
-        occurrences = self.merge_occurrences(semantic_occ, metadata_occ)
-        self.progress_step("merge", True, f"Trovati {len(occurrences)} match")
+        doc_ids = list(semantic_occ.keys() | metadata_occ.keys())
+        self.progress_step("merge", True, f"Trovati {len(doc_ids)} match")
 
         self.progress_step("scoring", False, f"calcolando i pesi per i migliori cv")
-        exp_meta_scores = compute_experience_metadata_score(job_details)
-        occurrences = apply_experience_metadata_boost(occurrences, exp_meta_scores)
-        occurrences = normalize_occurrences(occurrences)
+        exp_meta_scores = compute_experience_metadata_score(job_details, doc_ids=doc_ids)
+        scores = score_occurrences(doc_ids, semantic_occ, metadata_occ, exp_meta_scores, weights)
 
         cvs = {
-            str(doc.id): doc
-            for doc in CVDocument.objects.filter(id__in=list(occurrences.keys())).only(
-                "id", "candidate_name", "raw_text", "email"
+            str(row["id"]): row
+            for row in CVDocument.objects.filter(id__in=doc_ids).values(
+                "id", "candidate_name", "email"
             )
         }
 
         final_results = [
-            calculate_score(doc_id, categories, weights, cvs)
-            for doc_id, categories in occurrences.items()
-            if doc_id in cvs
+            build_result_row(doc_ids[i], score, cvs)
+            for i, score in enumerate(scores.tolist())
+            if doc_ids[i] in cvs
         ]
-        deduped_results = dedup_results_by_email(final_results)
-        limited_results = deduped_results[: max(1, int(top_k))]
+        limited_results = dedup_results_by_email(final_results, top_k=max(1, int(top_k)))
+
+        # Full CV text is only loaded for the rows that are returned.
+        raw_texts = {
+            str(doc_id): raw_text
+            for doc_id, raw_text in CVDocument.objects.filter(
+                id__in=[row["cv_id"] for row in limited_results]
+            ).values_list("id", "raw_text")
+        }
+        for row in limited_results:
+            row["cv"] = raw_texts.get(row["cv_id"], "")
         self.progress_step("scoring", True, f"trovati {len(limited_results)} match")
         return limited_results
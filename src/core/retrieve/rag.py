@@ -1,3 +1,7 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 import environ
 from datapizza.clients.openai import OpenAIClient
 from datapizza.embedders.openai import OpenAIEmbedder
@@ -6,17 +10,54 @@ from datapizza.modules.rewriters import ToolRewriter
 from datapizza.pipeline import DagPipeline
 
 from src.core.db import PgVectorStore
+from src.core.retrieve.cache import (
+    EMBEDDING_CACHE,
+    RETRIEVAL_CACHE,
+    LRUCache,
+    embedding_key,
+    retrieval_key,
+)
 
 env = environ.Env()
 
 
+class CachedOpenAIEmbedder(OpenAIEmbedder):
+    """OpenAIEmbedder that serves repeated texts from an LRU cache and embeds only the misses."""
+
+    def __init__(self, *args, cache: LRUCache = EMBEDDING_CACHE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    def _lookup(self, texts: list[str], model_name: str | None):
+        model = model_name or self.model_name
+        keys = [embedding_key(t, model) for t in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        return keys, vectors, missing
+
+    def _store(self, keys, vectors, missing, fresh) -> None:
+        for i, vector in zip(missing, fresh):
+            self.cache.set(keys[i], vector)
+            vectors[i] = vector
+
+    def embed(self, text: str | list[str], model_name: str | None = None):
+        texts = [text] if isinstance(text, str) else list(text)
+        keys, vectors, missing = self._lookup(texts, model_name)
+        if missing:
+            fresh = super().embed([texts[i] for i in missing], model_name)
+            self._store(keys, vectors, missing, fresh)
+        return vectors[0] if isinstance(text, str) else vectors
+
+
 class RagPipeline(DagPipeline):
+    MAX_REWRITE_WORKERS = 8
+
     def __init__(self, **kwargs):
         super().__init__()
         self.api_key = env.str("OPENAI_API_KEY")
         self.embedding_model = env.str("EMBEDDING_MODEL_NAME")
         self.openai_client = OpenAIClient(api_key=self.api_key)
-        self.embedder = OpenAIEmbedder(api_key=self.api_key, model_name=self.embedding_model)
+        self.embedder = CachedOpenAIEmbedder(api_key=self.api_key, model_name=self.embedding_model)
         self.query_rewriter = ToolRewriter(
             client=self.openai_client,
             system_prompt=(
@@ -43,3 +84,62 @@ class RagPipeline(DagPipeline):
         self.connect("rewriter", "embedder", target_key="text")
         self.connect("embedder", "retriever", target_key="query_vector")
         self.connect("retriever", "prompt", target_key="chunks")
+
+        # Rewrite-only DAG: batched retrieval rewrites each query on its own, then embeds
+        # all rewrites with a single embeddings request.
+        self.rewrite_pipeline = DagPipeline()
+        self.rewrite_pipeline.add_module("rewriter", self.query_rewriter)
+
+    def rewrite(self, user_prompt: str) -> str:
+        """Rewrite one user query for CV retrieval."""
+        result = self.rewrite_pipeline.run({"rewriter": {"user_prompt": user_prompt}})
+        return result["rewriter"]
+
+    def embed_queries(self, queries: list[str]) -> list[list[float]]:
+        """Rewrite the queries on a thread pool, then embed every rewrite in one request."""
+        # Sync clients only: this pipeline lives for the whole worker process, and an async
+        # client would keep pooled connections bound to the first, already closed, event loop.
+        with ThreadPoolExecutor(max_workers=min(len(queries), self.MAX_REWRITE_WORKERS)) as pool:
+            rewritten = list(pool.map(self.rewrite, queries))
+        return self.embedder.embed(rewritten)
+
+    def search_batch(
+        self,
+        vectors: list[list[float]],
+        k: int,
+        collection_name: str = "sample",
+    ) -> list[dict[str, Any]]:
+        """Best similarity per document for each vector; cache misses go out as one statement."""
+        keys = [retrieval_key(vector, k, collection_name) for vector in vectors]
+        hits: list[dict[str, Any] | None] = [RETRIEVAL_CACHE.get(key) for key in keys]
+        missing = [i for i, payload in enumerate(hits) if payload is None]
+        if missing:
+            fresh = self.vector_store.search_documents_multi(
+                collection_name, [vectors[i] for i in missing], k=k
+            )
+            for i, payload in zip(missing, fresh):
+                RETRIEVAL_CACHE.set(keys[i], payload)
+                hits[i] = payload
+        return hits
+
+    def run_batch(
+        self,
+        queries: list[str],
+        k: int,
+        collection_name: str = "sample",
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieve documents for several queries with one embeddings request and one KNN
+        statement. Each result has the PgVectorStore.search_metadata shape.
+        """
+        if not queries:
+            return []
+
+        vectors = self.embed_queries(queries)
+        return self.search_batch(vectors, k, collection_name)
+
+
+@functools.cache
+def get_rag_pipeline() -> RagPipeline:
+    """Return the process-wide RagPipeline so clients and the DAG are built once per worker."""
+    return RagPipeline()
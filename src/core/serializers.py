@@ -1,16 +1,28 @@
+import hashlib
+
+from celery import group
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from src.core.inject.inject_job_description import JobDescriptionIngestionJob
-from src.core.inject.injection import CVIngestionPipeline
-from src.core.models import CVDocument, UploadBatch, JobStatus, JobDescription
+from src.core.models import CVDocument, UploadBatch, UploadItem, JobStatus, JobDescription
 from src.core.tasks import ingest_upload_item_task
 
 
+def file_checksum(file_obj) -> str:
+    """SHA-256 hex digest of an uploaded file's content."""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks():
+        digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
+
+
 class CvSerializer(serializers.ModelSerializer):
     class Meta:
         model = CVDocument
-        fields = "__all__"
+        exclude = ("search_vector",)
         read_only_fields = (
             "id",
             "source_checksum",
@@ -19,11 +31,18 @@ class CvSerializer(serializers.ModelSerializer):
             "updated_at",
         )
 
-    @transaction.atomic
     def create(self, validated_data):
-        ingestion_pipeline = CVIngestionPipeline()
-        document = CVDocument.objects.create(**validated_data)
-        return ingestion_pipeline.ingest_cv_document(document)
+        checksum = file_checksum(validated_data["source_file"])
+        # A file identical to an already ingested CV reuses that document instead of being
+        # stored, extracted and embedded again.
+        existing = CVDocument.objects.filter(
+            source_checksum=checksum,
+            ingested_at__isnull=False,
+        ).first()
+        if existing is not None:
+            return existing
+        validated_data["source_checksum"] = checksum
+        return super().create(validated_data)
 
 
 class CVBulkUploadCreateSerializer(serializers.Serializer):
@@ -52,31 +71,68 @@ class CVBulkUploadCreateSerializer(serializers.Serializer):
     @transaction.atomic
     def create(self, validated_data):
         files = validated_data["files"]
+        checksums = [file_checksum(file_obj) for file_obj in files]
+        # Files identical to an already ingested CV reuse that document instead of being
+        # extracted and embedded again.
+        ingested = dict(
+            CVDocument.objects.filter(
+                source_checksum__in=set(checksums),
+                ingested_at__isnull=False,
+            ).values_list("source_checksum", "id")
+        )
+        new_files = [(f, c) for f, c in zip(files, checksums) if c not in ingested]
+        duplicates = len(files) - len(new_files)
+        now = timezone.now()
         batch = UploadBatch.objects.create(
-            status=JobStatus.PENDING,
+            status=JobStatus.SUCCESS if not new_files else JobStatus.PENDING,
             total_files=len(files),
-            processed_files=0,
+            processed_files=duplicates,
             failed_files=0,
+            started_at=now if not new_files else None,
+            completed_at=now if not new_files else None,
         )
 
-        items_payload = []
-        for file_obj in files:
-            document = CVDocument.objects.create(source_file=file_obj)
-            item = batch.items.create(
-                document=document,
-                filename=file_obj.name,
-                status=JobStatus.PENDING,
-            )
+        # FileField.pre_save still stores each file, but the rows go in as two INSERTs.
+        documents = CVDocument.objects.bulk_create(
+            [CVDocument(source_file=f, source_checksum=c) for f, c in new_files]
+        )
+        new_document_ids = iter(document.id for document in documents)
+        items = UploadItem.objects.bulk_create(
+            [
+                UploadItem(
+                    batch=batch,
+                    document_id=ingested[checksum],
+                    filename=file_obj.name,
+                    status=JobStatus.SUCCESS,
+                    completed_at=now,
+                )
+                if checksum in ingested
+                else UploadItem(
+                    batch=batch,
+                    document_id=next(new_document_ids),
+                    filename=file_obj.name,
+                    status=JobStatus.PENDING,
+                )
+                for file_obj, checksum in zip(files, checksums)
+            ]
+        )
+        item_ids = [str(item.id) for item in items if item.status == JobStatus.PENDING]
+        items_payload = [
+            {
+                "upload_item_id": str(item.id),
+                "document_id": str(item.document_id),
+                "filename": item.filename,
+                "status": item.status,
+            }
+            for item in items
+        ]
+
+        # One group publish for the whole batch, once the rows are visible to workers.
+        if item_ids:
             transaction.on_commit(
-                lambda item_id=str(item.id): ingest_upload_item_task.delay(item_id)
-            )
-            items_payload.append(
-                {
-                    "upload_item_id": str(item.id),
-                    "document_id": str(document.id),
-                    "filename": item.filename,
-                    "status": item.status,
-                }
+                lambda: group(
+                    ingest_upload_item_task.s(item_id) for item_id in item_ids
+                ).apply_async()
             )
 
         return {
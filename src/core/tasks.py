@@ -3,63 +3,88 @@
 from __future__ import annotations
 
 import copy
+import logging
 import traceback
+from datetime import timedelta
 
 from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init
+from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
 from src.core.retrieve.pipeline import CvScreenPipeline
-from src.core.inject.injection import CVIngestionPipeline
-from src.core.models import CVDocument, UploadBatch, UploadItem, JobStatus, SearchRun
-
-
-def _refresh_batch_status(batch: UploadBatch) -> None:
-    """Recompute aggregate batch counters/status from related UploadItem states."""
-    total = batch.items.count()
-    processed = batch.items.filter(status__in=[JobStatus.SUCCESS, JobStatus.FAILED]).count()
-    failed = batch.items.filter(status=JobStatus.FAILED).count()
-
-    if processed == 0:
-        status = JobStatus.RUNNING
-        completed_at = None
-    elif failed == total:
-        status = JobStatus.FAILED
-        completed_at = timezone.now()
-    elif processed == total and failed == 0:
-        status = JobStatus.SUCCESS
-        completed_at = timezone.now()
-    elif processed == total and failed > 0:
-        status = JobStatus.PARTIAL
-        completed_at = timezone.now()
-    else:
-        status = JobStatus.RUNNING
-        completed_at = None
-
-    batch.total_files = total
-    batch.processed_files = processed
-    batch.failed_files = failed
-    batch.status = status
-    batch.completed_at = completed_at
-    if batch.started_at is None:
-        batch.started_at = timezone.now()
-    batch.save(
-        update_fields=[
-            "total_files",
-            "processed_files",
-            "failed_files",
-            "status",
-            "started_at",
-            "completed_at",
-        ]
+from src.core.retrieve.rag import get_rag_pipeline
+from src.core.inject.injection import get_ingestion_pipeline
+from src.core.models import UploadBatch, UploadItem, JobStatus, SearchRun
+
+logger = logging.getLogger(__name__)
+
+# Soft limit for one ingestion attempt: the task gets SoftTimeLimitExceeded and goes through
+# the normal retry/FAILED path, so the item and its batch still reach a terminal status.
+INGEST_SOFT_TIME_LIMIT = 15 * 60
+# A RUNNING item older than this cannot still be owned by a live task (the soft limit plus
+# room for the failure path), so a redelivered message may claim it again.
+INGEST_STALE_AFTER = INGEST_SOFT_TIME_LIMIT + 5 * 60
+
+
+@worker_process_init.connect
+def _warm_pipelines(**_kwargs) -> None:
+    """Build the cached pipelines in each worker child before it receives its first task."""
+    try:
+        get_ingestion_pipeline()
+        get_rag_pipeline()
+    except Exception:  # noqa: BLE001
+        logger.exception("Pipeline warm-up failed; pipelines will be built on first use")
+
+
+def _terminal_batch_status(total: int, failed: int) -> str:
+    """Status of a batch whose items have all finished."""
+    if failed == 0:
+        return JobStatus.SUCCESS
+    return JobStatus.FAILED if failed >= total else JobStatus.PARTIAL
+
+
+def _record_item_finished(batch: UploadBatch, failed: bool) -> None:
+    """Count one finished item on its batch and set the terminal status once all are done."""
+    # Atomic in-database increments, so concurrent workers finishing items of the same
+    # batch never overwrite each other's counts.
+    UploadBatch.objects.filter(id=batch.id).update(
+        processed_files=F("processed_files") + 1,
+        failed_files=F("failed_files") + (1 if failed else 0),
     )
 
+    with transaction.atomic():
+        # Only the worker that sees the last increment gets a row back; the lock keeps a
+        # concurrent finisher from flipping the status twice.
+        done = (
+            UploadBatch.objects.select_for_update()
+            .filter(
+                id=batch.id,
+                processed_files__gte=F("total_files"),
+                completed_at__isnull=True,
+            )
+            .first()
+        )
+        if done is None:
+            return
+
+        done.status = _terminal_batch_status(done.total_files, done.failed_files)
+        done.completed_at = timezone.now()
+        done.save(update_fields=["status", "completed_at"])
+
 
-@shared_task(bind=True, name="core.ingest_upload_item_task")
+@shared_task(
+    bind=True,
+    name="core.ingest_upload_item_task",
+    soft_time_limit=INGEST_SOFT_TIME_LIMIT,
+)
 def ingest_upload_item_task(self, upload_item_id: str) -> str:
     """Ingest one UploadItem end-to-end and update both item and batch status."""
     max_retries = 3
     item = UploadItem.objects.select_related("batch", "document").filter(id=upload_item_id).first()
-    ingestion_pipeline = CVIngestionPipeline()
+    ingestion_pipeline = get_ingestion_pipeline()
     if item is None:
         if self.request.retries < max_retries:
             raise self.retry(
@@ -67,13 +92,26 @@ def ingest_upload_item_task(self, upload_item_id: str) -> str:
                 countdown=2 ** (self.request.retries + 1),
             )
         raise ValueError(f"UploadItem {upload_item_id} not found")
-    if item.status == JobStatus.SUCCESS:
-        return str(item.id)
 
+    # Claim the item with a conditional UPDATE: a duplicate delivery, or an item that is
+    # finished or running in a live task, matches no row and is skipped. A RUNNING item
+    # past INGEST_STALE_AFTER was left behind by a worker that died mid-ingestion; with late
+    # acks its message is redelivered, and that delivery takes the item over.
+    started_at = timezone.now()
+    stale_before = started_at - timedelta(seconds=INGEST_STALE_AFTER)
+    claimed = UploadItem.objects.filter(
+        Q(status=JobStatus.PENDING) | Q(status=JobStatus.RUNNING, started_at__lt=stale_before),
+        id=item.id,
+    ).update(
+        status=JobStatus.RUNNING,
+        started_at=started_at,
+        error_message="",
+    )
+    if not claimed:
+        return str(item.id)
     item.status = JobStatus.RUNNING
-    item.started_at = timezone.now()
+    item.started_at = started_at
     item.error_message = ""
-    item.save(update_fields=["status", "started_at", "error_message"])
 
     batch = item.batch
     if batch.started_at is None:
@@ -85,27 +123,30 @@ def ingest_upload_item_task(self, upload_item_id: str) -> str:
         if not item.document_id:
             raise ValueError("Upload item has no associated CVDocument")
 
-        document = CVDocument.objects.get(id=item.document_id)
-        ingestion_pipeline.ingest_cv_document(document)
+        ingestion_pipeline.ingest_cv_document(item.document)
 
         item.status = JobStatus.SUCCESS
         item.completed_at = timezone.now()
         item.save(update_fields=["status", "completed_at"])
     except Exception as exc:  # noqa: BLE001
+        # SoftTimeLimitExceeded lands here too and is retried or failed like any other error.
+        if isinstance(exc, SoftTimeLimitExceeded):
+            reason = f"ingestion exceeded {INGEST_SOFT_TIME_LIMIT}s"
+        else:
+            reason = str(exc)
         if self.request.retries < max_retries:
+            # A retry does not finish the item, so the batch counters are left alone.
             item.status = JobStatus.PENDING
-            item.error_message = f"retrying ({self.request.retries + 1}/{max_retries}): {exc}"
+            item.error_message = f"retrying ({self.request.retries + 1}/{max_retries}): {reason}"
             item.save(update_fields=["status", "error_message"])
-            _refresh_batch_status(batch)
             raise self.retry(exc=exc, countdown=2 ** (self.request.retries + 1))
 
         item.status = JobStatus.FAILED
-        item.error_message = str(exc)
+        item.error_message = reason
         item.completed_at = timezone.now()
         item.save(update_fields=["status", "error_message", "completed_at"])
-    finally:
-        _refresh_batch_status(batch)
 
+    _record_item_finished(batch, failed=item.status == JobStatus.FAILED)
     return str(item.id)
 
 
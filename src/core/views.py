@@ -3,6 +3,9 @@ import copy
 import logging
 import uuid
 
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,7 +13,7 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from src.core.models import UploadBatch, CVDocument, SearchRun, JobStatus, JobDescription
-from src.core.tasks import search_run_task, DEFAULT_STEPS
+from src.core.tasks import ingest_upload_item_task, search_run_task, DEFAULT_STEPS
 from src.core.serializers import (
     CVBulkUploadCreateSerializer,
     CvSerializer,
@@ -25,13 +28,50 @@ class CVUploadView(APIView):
     """Upload a CV document."""
 
     def post(self, request):
-        """Validate and ingest a single uploaded CV synchronously."""
+        """Store an uploaded CV and enqueue its ingestion as a one-item upload batch."""
         serializer = CvSerializer(data=request.data)
         if not serializer.is_valid():
             logger.warning("CV upload validation failed: %s", serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        filename = serializer.validated_data["source_file"].name
+        with transaction.atomic():
+            document = serializer.save()
+            if document.ingested_at is not None:
+                # Same content as an already ingested CV: record a finished batch, enqueue nothing.
+                now = timezone.now()
+                batch = UploadBatch.objects.create(
+                    status=JobStatus.SUCCESS,
+                    total_files=1,
+                    processed_files=1,
+                    started_at=now,
+                    completed_at=now,
+                )
+                item = batch.items.create(
+                    document=document,
+                    filename=filename,
+                    status=JobStatus.SUCCESS,
+                    completed_at=now,
+                )
+            else:
+                batch = UploadBatch.objects.create(status=JobStatus.PENDING, total_files=1)
+                item = batch.items.create(
+                    document=document,
+                    filename=filename,
+                    status=JobStatus.PENDING,
+                )
+                transaction.on_commit(lambda: ingest_upload_item_task.delay(str(item.id)))
+
+        return Response(
+            {
+                "document_id": str(document.id),
+                "batch_id": str(batch.id),
+                "upload_item_id": str(item.id),
+                "status": item.status,
+                "status_url": reverse("cv-bulk-upload-status", args=[batch.id]),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 class SearchRunView(APIView):
@@ -110,7 +150,20 @@ class CVBulkUploadStatusView(APIView):
         except UploadBatch.DoesNotExist:
             return Response({"error": "batch not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        items = batch.items.all().order_by("created_at")
+        # Only the columns the payload needs, fetched in chunks rather than as model instances.
+        items = (
+            batch.items.order_by("created_at")
+            .values(
+                "id",
+                "document_id",
+                "filename",
+                "status",
+                "error_message",
+                "started_at",
+                "completed_at",
+            )
+            .iterator(chunk_size=500)
+        )
         return Response(
             {
                 "batch_id": str(batch.id),
@@ -122,13 +175,13 @@ class CVBulkUploadStatusView(APIView):
                 "completed_at": batch.completed_at,
                 "items": [
                     {
-                        "upload_item_id": str(item.id),
-                        "document_id": str(item.document_id) if item.document_id else None,
-                        "filename": item.filename,
-                        "status": item.status,
-                        "error_message": item.error_message,
-                        "started_at": item.started_at,
-                        "completed_at": item.completed_at,
+                        "upload_item_id": str(item["id"]),
+                        "document_id": str(item["document_id"]) if item["document_id"] else None,
+                        "filename": item["filename"],
+                        "status": item["status"],
+                        "error_message": item["error_message"],
+                        "started_at": item["started_at"],
+                        "completed_at": item["completed_at"],
                     }
                     for item in items
                 ],
@@ -7,11 +7,16 @@ import pytest
 from datapizza.clients.mock_client import MockClient
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework.test import APIClient
 
-from src.core.inject.injection import CVIngestionPipeline
+from src.core.inject.injection import CVIngestionPipeline, get_ingestion_pipeline
+from src.core.retrieve.cache import EMBEDDING_CACHE, RETRIEVAL_CACHE
+from src.core.retrieve.rag import get_rag_pipeline
 
 User = get_user_model()
 
+DEFAULT_CV_BYTES = b"Test CV content"
+
 class MockInjectDocument(CVIngestionPipeline):
     """
     Test double for `InjectDocument`.
@@ -24,16 +29,29 @@ class MockInjectDocument(CVIngestionPipeline):
         extracted_text: str = "Mock CV text",
         extracted_metadata: dict[str, Any] | None = None,
         embedded_chunks: list[Any] | None = None,
+        client: Any | None = None,
     ) -> None:
         # Do NOT call super().__init__() to avoid creating real external clients.
-        self.client = MockClient()
-        self.embedder_client = MockClient()
+        self._client: Any | None = client
+        self._embedder_client: MockClient | None = None
         self.embedding_model_name = "mock-embedding"
         self._extracted_text = extracted_text
         self._extracted_metadata = extracted_metadata or {}
         self._embedded_chunks = embedded_chunks or []
         self.yaml_path: str | None = None
 
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = MockClient()
+        return self._client
+
+    @property
+    def embedder_client(self) -> MockClient:
+        if self._embedder_client is None:
+            self._embedder_client = MockClient()
+        return self._embedder_client
+
     def from_yaml(self, yaml_path: str) -> "MockInjectDocument":
         self.yaml_path = yaml_path
         return self
@@ -43,25 +61,36 @@ class MockInjectDocument(CVIngestionPipeline):
         _ = metadata
         return self._embedded_chunks
 
-@pytest.fixture
-def api_client(is_authenticated: bool = True):
-    from rest_framework.test import APIClient
-    if is_authenticated:
-        user = User.objects.create(username="user")
-        client = APIClient()
-        client.force_authenticate(user=user)
-    else:
-        client = APIClient()
+@pytest.fixture(autouse=True)
+def _clear_process_caches():
+    """Drop memoized pipelines and cached embeddings/hits so no test sees another's mocks."""
+    yield
+    get_ingestion_pipeline.cache_clear()
+    get_rag_pipeline.cache_clear()
+    EMBEDDING_CACHE.clear()
+    RETRIEVAL_CACHE.clear()
+
+
+@pytest.fixture(scope="session")
+def _session_api_client():
+    # The views never read request.user, so an unsaved user is enough to authenticate and
+    # the client can be built once per session instead of once per test.
+    client = APIClient()
+    client.force_authenticate(user=User(username="user"))
     return client
 
 
+@pytest.fixture
+def api_client(_session_api_client):
+    _session_api_client.cookies.clear()
+    return _session_api_client
 
 
 @pytest.fixture
 def make_uploaded_file():
     def _make(
         name: str = "cv_test.txt",
-        content: bytes = b"Test CV content",
+        content: bytes = DEFAULT_CV_BYTES,
         content_type: str = "text/plain",
     ) -> SimpleUploadedFile:
         return SimpleUploadedFile(name, content, content_type=content_type)
@@ -77,20 +106,14 @@ def temp_media_root(settings, tmp_path):
 
 
 @pytest.fixture
-def build_mock_inject_document():
-    def _build(
-        *,
-        extracted_text: str = "Mock CV text",
-        extracted_metadata: dict[str, Any] | None = None,
-        embedded_chunks: list[Any] | None = None,
-    ) -> MagicMock:
-        mock = MagicMock()
-        mock.from_yaml.return_value = mock
-        mock.extract_metadata.return_value = {
-            "text": extracted_text,
-            "metadata": extracted_metadata or {},
-        }
-        mock.run.return_value = embedded_chunks or []
-        return mock
-
-    return _build
+def make_upload_item_qs():
+    """Wire a patched UploadItem so select_related(...).filter(...).first() returns `item`."""
+
+    def _make(upload_item_cls: MagicMock, item: Any) -> None:
+        select_related_qs = MagicMock()
+        filtered_qs = MagicMock()
+        upload_item_cls.objects.select_related.return_value = select_related_qs
+        select_related_qs.filter.return_value = filtered_qs
+        filtered_qs.first.return_value = item
+
+    return _make
@@ -8,25 +8,27 @@ import pytest
 from tests.conftest import MockInjectDocument
 
 
+_CASE_VALID = (
+    "FULL_TEXT:\nMario Rossi CV\n\nMETADATA_JSON:\n"
+    '{"candidate_name":"Mario Rossi","contact":{"email":"mario.rossi@example.com"}}',
+    "Mario Rossi CV",
+    {"candidate_name": "Mario Rossi", "contact": {"email": "mario.rossi@example.com"}},
+)
+_CASE_INVALID_JSON = (
+    "FULL_TEXT:\nCV content\n\nMETADATA_JSON:\n{invalid_json}",
+    "CV content",
+    {},
+)
+
+
 @pytest.mark.parametrize(
     ("raw_response_text", "expected_text", "expected_metadata"),
-    [
-        (
-            "FULL_TEXT:\nMario Rossi CV\n\nMETADATA_JSON:\n"
-            '{"candidate_name":"Mario Rossi","contact":{"email":"mario.rossi@example.com"}}',
-            "Mario Rossi CV",
-            {"candidate_name": "Mario Rossi", "contact": {"email": "mario.rossi@example.com"}},
-        ),
-        (
-            "FULL_TEXT:\nCV content\n\nMETADATA_JSON:\n{invalid_json}",
-            "CV content",
-            {},
-        ),
-    ],
+    [_CASE_VALID, _CASE_INVALID_JSON],
+    ids=["valid_json", "invalid_json"],
 )
 def test_extract_metadata_parsing(raw_response_text, expected_text, expected_metadata):
-    inject_doc = MockInjectDocument()
-    inject_doc.client.invoke = MagicMock(return_value=SimpleNamespace(text=raw_response_text))
+    invoke = MagicMock(return_value=SimpleNamespace(text=raw_response_text))
+    inject_doc = MockInjectDocument(client=SimpleNamespace(invoke=invoke))
 
     result = inject_doc.extract_metadata("/tmp/fake.pdf")
 
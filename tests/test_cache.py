@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from src.core.retrieve import cache as cache_module
+from src.core.retrieve.cache import LRUCache, embedding_key, retrieval_key
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+
+    now[0] = 105.0
+    assert cache.get("a") == 1
+
+    now[0] = 111.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_embedding_key_normalizes_whitespace_and_includes_model():
+    assert embedding_key("python  django\n", "m1") == embedding_key("python django", "m1")
+    assert embedding_key("python django", "m1") != embedding_key("python django", "m2")
+
+
+def test_retrieval_key_depends_on_vector_and_k():
+    assert retrieval_key([0.1, 0.2], 5, "sample") == retrieval_key([0.1, 0.2], 5, "sample")
+    assert retrieval_key([0.1, 0.2], 5, "sample") != retrieval_key([0.1, 0.2], 10, "sample")
+    assert retrieval_key([0.1, 0.2], 5, "sample") != retrieval_key([0.2, 0.1], 5, "sample")
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from src.core.db import PgVectorStore
+from src.core.models import Chunk, CVDocument
+
+
+@pytest.mark.parametrize(
+    ("k", "expected"),
+    [(1, 40), (50, 200), (250, 1000), (500, 1000)],
+    ids=["min", "scaled", "at_max", "clamped"],
+)
+@patch("src.core.db.connection")
+def test_set_ef_search_is_clamped_to_pgvector_range(mock_connection, k, expected):
+    PgVectorStore()._set_ef_search(k)
+
+    cursor = mock_connection.cursor.return_value.__enter__.return_value
+    cursor.execute.assert_called_once_with("SET LOCAL hnsw.ef_search = %s", [expected])
+
+
+def _vec(x: float, y: float) -> list[float]:
+    return [x, y] + [0.0] * (PgVectorStore.DEFAULT_DIMENSIONS - 2)
+
+
+@pytest.mark.django_db
+def test_search_documents_multi_keeps_query_order_and_best_chunk_per_document():
+    doc_a, doc_b, doc_c = (CVDocument.objects.create() for _ in range(3))
+    for i, (document, vector) in enumerate(
+        [(doc_a, _vec(1, 0)), (doc_a, _vec(1, 0.1)), (doc_b, _vec(1, 1)), (doc_c, _vec(0, 1))]
+    ):
+        Chunk.objects.create(document=document, chunk_index=i, text_chunk="", embedding=vector)
+
+    # Binds the vectors as one halfvec[] parameter and runs a LATERAL KNN per vector.
+    results = PgVectorStore().search_documents_multi("sample", [_vec(1, 0), _vec(0, 1)], k=2)
+
+    hits = [
+        [(h["metadata"]["document_id"], h["metadata"]["similarity"]) for h in r["retriever"]]
+        for r in results
+    ]
+    # Both of doc_a's chunks fill k=2 and collapse to one row with the best similarity.
+    assert [doc_id for doc_id, _ in hits[0]] == [str(doc_a.id)]
+    assert hits[0][0][1] == pytest.approx(1.0, abs=1e-3)
+    assert [doc_id for doc_id, _ in hits[1]] == [str(doc_c.id), str(doc_b.id)]
+    assert hits[1][0][1] == pytest.approx(1.0, abs=1e-3)
+    assert hits[1][1][1] == pytest.approx(2**-0.5, abs=1e-3)
+
+
+@pytest.mark.django_db
+def test_search_metadata_multi_ranks_each_pair_with_its_category_weights():
+    in_text = CVDocument.objects.create(raw_text="django django")
+    in_metadata = CVDocument.objects.create(metadata={"skills": "django django"})
+
+    out = PgVectorStore.search_metadata_multi(
+        [("education", "django"), ("experience", "django"), ("skill", "  ")], k=1
+    )
+
+    # Education weights metadata (label B) over raw text (label A); experience the reverse.
+    assert [r["metadata"]["document_id"] for r in out["education"]["retriever"]] == [
+        str(in_metadata.id)
+    ]
+    assert [r["metadata"]["document_id"] for r in out["experience"]["retriever"]] == [
+        str(in_text.id)
+    ]
+    assert out["skill"] == {"retriever": []}
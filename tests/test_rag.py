@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from datapizza.embedders.openai import OpenAIEmbedder
+
+from src.core.retrieve.rag import RagPipeline
+
+
+def _fake_embed(self, text, model_name=None):
+    return [[float(len(t)), 1.0] for t in text]
+
+
+@patch.object(OpenAIEmbedder, "embed", autospec=True, side_effect=_fake_embed)
+def test_run_batch_can_be_called_repeatedly_on_one_pipeline(mock_embed, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("EMBEDDING_MODEL_NAME", "test-embedding")
+    pipeline = RagPipeline()
+    pipeline.rewrite_pipeline.run = MagicMock(
+        side_effect=lambda inputs: {"rewriter": inputs["rewriter"]["user_prompt"].upper()}
+    )
+    pipeline.vector_store.search_documents_multi = MagicMock(
+        side_effect=lambda collection_name, vectors, k: [
+            {"retriever": [{"metadata": {"document_id": "doc-1", "similarity": v[0]}}]}
+            for v in vectors
+        ]
+    )
+
+    # The same process-wide pipeline serves every search task in a worker.
+    first = pipeline.run_batch(["python", "django"], k=5)
+    second = pipeline.run_batch(["postgres developer"], k=5)
+
+    assert [r["retriever"][0]["metadata"]["similarity"] for r in first] == [6.0, 6.0]
+    assert second[0]["retriever"][0]["metadata"]["similarity"] == 18.0
+    assert mock_embed.call_count == 2
+    assert mock_embed.call_args.args[1] == ["POSTGRES DEVELOPER"]
@@ -1,25 +1,39 @@
 from __future__ import annotations
 
+import numpy as np
 import pytest
 
+from src.core.retrieve._kernels import _score_loop, _score_numpy
 from src.core.retrieve.pipeline import (
     _parse_experience_constraints,
     _score_years_against_constraints,
     dedup_results_by_email,
-    normalize_occurrences,
+    score_occurrences,
+)
+
+_EXPERIENCE_CASES = (
+    ("less than 3 years", (None, 3.0)),
+    ("at least 5 years", (5.0, None)),
+    ("2-4 years", (2.0, 4.0)),
+    ("5+ years", (5.0, None)),
+    ("no years mentioned", (None, None)),
+)
+
+_YEAR_CASES = (
+    (2, None, 3, 1.0),
+    (5, None, 3, 0.6),
+    (6, 5, None, 1.0),
+    (3, 5, None, 0.6),
+    (4, 2, 6, 1.0),
+    (1, 2, 6, 0.5),
+    (10, 2, 6, 0.6),
 )
-from src.core.serializers import SearchRunRequestSerializer
 
 
 @pytest.mark.parametrize(
     ("query", "expected"),
-    [
-        ("less than 3 years", (None, 3.0)),
-        ("at least 5 years", (5.0, None)),
-        ("2-4 years", (2.0, 4.0)),
-        ("5+ years", (5.0, None)),
-        ("no years mentioned", (None, None)),
-    ],
+    _EXPERIENCE_CASES,
+    ids=["lt3", "gte5", "range24", "plus5", "none"],
 )
 def test_parse_experience_constraints(query, expected):
     assert _parse_experience_constraints(query) == expected
@@ -27,110 +41,138 @@ def test_parse_experience_constraints(query, expected):
 
 @pytest.mark.parametrize(
     ("years", "min_years", "max_years", "expected"),
-    [
-        (2, None, 3, 1.0),
-        (5, None, 3, 0.6),
-        (6, 5, None, 1.0),
-        (3, 5, None, 0.6),
-        (4, 2, 6, 1.0),
-        (1, 2, 6, 0.5),
-        (10, 2, 6, 0.6),
+    _YEAR_CASES,
+    ids=[
+        "under_max",
+        "over_max",
+        "over_min",
+        "under_min",
+        "in_range",
+        "below_range",
+        "above_range",
     ],
 )
 def test_score_years_against_constraints(years, min_years, max_years, expected):
     assert _score_years_against_constraints(years, min_years, max_years) == pytest.approx(expected)
 
 
-def test_normalize_occurrences_min_max_per_category():
+@pytest.mark.parametrize(
+    ("category", "expected"),
+    [("skill", [0.0, 1.0, 0.5]), ("education", [0.0, 0.0, 1.0]), ("experience", [1.0, 0.0, 0.5])],
+    ids=["skill", "education", "experience"],
+)
+def test_score_occurrences_min_max_normalizes_each_category(category, expected):
     occ = {
         "doc_a": {"skill": 0.2, "education": 0.3, "experience": 0.5},
         "doc_b": {"skill": 0.6, "education": 0.3, "experience": 0.1},
         "doc_c": {"skill": 0.4, "education": 0.9, "experience": 0.3},
     }
 
-    normalized = normalize_occurrences(occ)
+    # With all weight on one category the score is that category's normalized value.
+    scores = score_occurrences(list(occ), occ, {}, {}, {category: 1.0})
 
-    assert normalized["doc_a"]["skill"] == pytest.approx(0.0)
-    assert normalized["doc_b"]["skill"] == pytest.approx(1.0)
-    assert normalized["doc_c"]["skill"] == pytest.approx(0.5)
+    assert scores.tolist() == pytest.approx(expected)
 
-    assert normalized["doc_a"]["education"] == pytest.approx(0.0)
-    assert normalized["doc_b"]["education"] == pytest.approx(0.0)
-    assert normalized["doc_c"]["education"] == pytest.approx(1.0)
 
-    assert normalized["doc_b"]["experience"] == pytest.approx(0.0)
-    assert normalized["doc_a"]["experience"] == pytest.approx(1.0)
-    assert normalized["doc_c"]["experience"] == pytest.approx(0.5)
+def test_score_occurrences_blends_experience_metadata_and_weights():
+    semantic_occ = {
+        "doc_a": {"skill": 1.0, "education": 0.0, "experience": 0.0},
+        "doc_b": {"skill": 0.0, "education": 1.0, "experience": 1.0},
+    }
+    weights = {"skill": 0.6, "education": 0.3, "experience": 0.1}
 
+    scores = score_occurrences(["doc_a", "doc_b"], semantic_occ, {}, {"doc_a": 1.0}, weights)
 
-@pytest.mark.parametrize(
-    ("weights", "is_valid"),
-    [
-        ({"skill": 0.1, "experience": 0.7, "education": 0.2}, True),
-        ({"skill": 1, "experience": 0, "education": 0}, True),
-        ({"skill": 0.2, "experience": 0.2, "education": 0.2}, False),
-        ({"skill": 0.5, "experience": 0.6, "education": -0.1}, False),
-    ],
-)
-def test_search_request_weights_sum_to_one(weights, is_valid):
-    serializer = SearchRunRequestSerializer(
-        data={"job_offer_text": "backend engineer", "weights": weights}
-    )
-    assert serializer.is_valid() is is_valid
+    assert scores.tolist() == pytest.approx([0.7, 0.3])
 
 
-def test_dedup_results_by_email_keeps_best_score():
-    rows = [
-        {
-            "cv_id": "1",
-            "candidate_name": "Mario Rossi",
-            "candidate_email": "mario@example.com",
-            "score": 0.5,
-        },
-        {
-            "cv_id": "2",
-            "candidate_name": "Mario Rossi",
-            "candidate_email": "mario@example.com",
-            "score": 0.8,
-        },
-        {
-            "cv_id": "3",
-            "candidate_name": "Sara Neri",
-            "candidate_email": "sara@example.com",
-            "score": 0.7,
-        },
-    ]
+@pytest.mark.parametrize("blend_experience", [True, False])
+def test_score_loop_matches_numpy_kernel(blend_experience):
+    rng = np.random.default_rng(0)
+    args = (rng.random((20, 3)), rng.random((20, 3)), rng.random(20), blend_experience, 2)
+    weights = np.array([0.5, 0.3, 0.2])
 
-    deduped = dedup_results_by_email(rows)
+    assert _score_loop(*args, weights) == pytest.approx(_score_numpy(*args, weights))
 
-    assert len(deduped) == 2
-    assert deduped[0]["cv_id"] == "2"
-    assert deduped[0]["score"] == pytest.approx(0.8)
-    assert deduped[1]["cv_id"] == "3"
 
+def test_score_occurrences_empty():
+    assert score_occurrences([], {}, {}, {}, {"skill": 1.0}).size == 0
 
-def test_dedup_results_by_email_fallback_to_name_when_email_missing():
-    rows = [
-        {"cv_id": "1", "candidate_name": "Valentina Greco", "candidate_email": "", "score": 0.3},
-        {"cv_id": "2", "candidate_name": "Valentina Greco", "candidate_email": None, "score": 0.6},
-        {"cv_id": "3", "candidate_name": "Chiara Moretti", "candidate_email": None, "score": 0.5},
-    ]
 
-    deduped = dedup_results_by_email(rows)
-
-    assert len(deduped) == 2
-    assert deduped[0]["cv_id"] == "2"
-    assert deduped[1]["cv_id"] == "3"
+@pytest.mark.parametrize(
+    ("rows", "expected_ids"),
+    [
+        # Same email: keep the best score.
+        (
+            [
+                {
+                    "cv_id": "1",
+                    "candidate_name": "Mario Rossi",
+                    "candidate_email": "mario@example.com",
+                    "score": 0.5,
+                },
+                {
+                    "cv_id": "2",
+                    "candidate_name": "Mario Rossi",
+                    "candidate_email": "mario@example.com",
+                    "score": 0.8,
+                },
+                {
+                    "cv_id": "3",
+                    "candidate_name": "Sara Neri",
+                    "candidate_email": "sara@example.com",
+                    "score": 0.7,
+                },
+            ],
+            ["2", "3"],
+        ),
+        # Email missing: fall back to the candidate name.
+        (
+            [
+                {
+                    "cv_id": "1",
+                    "candidate_name": "Valentina Greco",
+                    "candidate_email": "",
+                    "score": 0.3,
+                },
+                {
+                    "cv_id": "2",
+                    "candidate_name": "Valentina Greco",
+                    "candidate_email": None,
+                    "score": 0.6,
+                },
+                {
+                    "cv_id": "3",
+                    "candidate_name": "Chiara Moretti",
+                    "candidate_email": None,
+                    "score": 0.5,
+                },
+            ],
+            ["2", "3"],
+        ),
+        # Name and email missing: every CV is its own candidate.
+        (
+            [
+                {"cv_id": "a", "candidate_name": "", "candidate_email": "", "score": 0.2},
+                {"cv_id": "b", "candidate_name": "", "candidate_email": "", "score": 0.9},
+            ],
+            ["b", "a"],
+        ),
+    ],
+    ids=["same_email", "name_fallback", "cv_id_fallback"],
+)
+def test_dedup_results_by_email(rows, expected_ids):
+    assert [row["cv_id"] for row in dedup_results_by_email(rows)] == expected_ids
 
 
-def test_dedup_results_by_email_fallback_to_cv_id_when_name_and_email_missing():
+def test_dedup_results_by_email_top_k_returns_best_rows():
     rows = [
-        {"cv_id": "a", "candidate_name": "", "candidate_email": "", "score": 0.2},
-        {"cv_id": "b", "candidate_name": "", "candidate_email": "", "score": 0.9},
+        {"cv_id": "1", "candidate_name": "A", "candidate_email": "a@example.com", "score": 0.4},
+        {"cv_id": "2", "candidate_name": "A", "candidate_email": "a@example.com", "score": 0.9},
+        {"cv_id": "3", "candidate_name": "B", "candidate_email": "b@example.com", "score": 0.7},
+        {"cv_id": "4", "candidate_name": "C", "candidate_email": "c@example.com", "score": 0.2},
     ]
 
-    deduped = dedup_results_by_email(rows)
+    deduped = dedup_results_by_email(rows, top_k=2)
 
-    assert len(deduped) == 2
-    assert deduped[0]["cv_id"] == "b"
-    assert deduped[1]["cv_id"] == "a"
+    assert [row["cv_id"] for row in deduped] == ["2", "3"]
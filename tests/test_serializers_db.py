@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+
+from src.core.models import CVDocument, JobDescription, JobStatus, UploadBatch
+from src.core.serializers import (
+    CVBulkUploadCreateSerializer,
+    CvSerializer,
+    JobDescriptionSerializer,
+)
+from tests.conftest import DEFAULT_CV_BYTES
+
+
+@pytest.mark.django_db
+def test_cv_serializer_create_only_stores_document(temp_media_root, make_uploaded_file):
+    serializer = CvSerializer(data={"source_file": make_uploaded_file()})
+    assert serializer.is_valid(), serializer.errors
+    document = serializer.save()
+
+    stored = CVDocument.objects.get(id=document.id)
+    assert stored.source_file.name
+    assert stored.raw_text == ""
+    assert stored.ingested_at is None
+    assert stored.source_checksum == hashlib.sha256(DEFAULT_CV_BYTES).hexdigest()
+
+
+@pytest.mark.django_db
+def test_bulk_upload_reuses_already_ingested_document(temp_media_root, make_uploaded_file):
+    existing = CVDocument.objects.create(
+        source_checksum=hashlib.sha256(DEFAULT_CV_BYTES).hexdigest(),
+        ingested_at=timezone.now(),
+    )
+    files = [make_uploaded_file(), make_uploaded_file(name="new.txt", content=b"Another CV")]
+
+    serializer = CVBulkUploadCreateSerializer(data={"files": files})
+    assert serializer.is_valid(), serializer.errors
+    payload = serializer.save()
+
+    duplicate, new = payload["items"]
+    assert duplicate["document_id"] == str(existing.id)
+    assert duplicate["status"] == JobStatus.SUCCESS
+    assert new["status"] == JobStatus.PENDING
+    assert CVDocument.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_cv_serializer_create_reuses_already_ingested_document(
+    temp_media_root, make_uploaded_file
+):
+    existing = CVDocument.objects.create(
+        source_checksum=hashlib.sha256(DEFAULT_CV_BYTES).hexdigest(),
+        ingested_at=timezone.now(),
+    )
+
+    serializer = CvSerializer(data={"source_file": make_uploaded_file()})
+    assert serializer.is_valid(), serializer.errors
+
+    assert serializer.save().id == existing.id
+    assert CVDocument.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_bulk_upload_of_only_duplicates_completes_the_batch(temp_media_root, make_uploaded_file):
+    CVDocument.objects.create(
+        source_checksum=hashlib.sha256(DEFAULT_CV_BYTES).hexdigest(),
+        ingested_at=timezone.now(),
+    )
+
+    serializer = CVBulkUploadCreateSerializer(data={"files": [make_uploaded_file()]})
+    assert serializer.is_valid(), serializer.errors
+    payload = serializer.save()
+
+    batch = UploadBatch.objects.get(id=payload["batch_id"])
+    assert batch.status == JobStatus.SUCCESS
+    assert batch.processed_files == 1
+    assert batch.started_at is not None
+    assert batch.completed_at is not None
+
+
+@pytest.mark.django_db
+@patch("src.core.serializers.JobDescriptionIngestionJob")
+def test_job_description_serializer_create_delegates_to_ingestion_job(mock_job_cls):
+    mock_job = mock_job_cls.return_value
+    mock_job.ingest_job_description.return_value = JobDescription(
+        text="Backend engineer with Python",
+        metadata={"split": {"skill": "python", "education": "", "experience": "3+ years"}},
+        skill=[0.1] * 1536,
+        education=[0.2] * 1536,
+        experience=[0.3] * 1536,
+    )
+    serializer = JobDescriptionSerializer(data={"text": "Backend engineer with Python"})
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+
+    mock_job.ingest_job_description.assert_called_once_with("Backend engineer with Python")
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+
+from src.core.serializers import SearchRunRequestSerializer
+
+_WEIGHT_CASES = (
+    ({"skill": 0.1, "experience": 0.7, "education": 0.2}, True),
+    ({"skill": 1, "experience": 0, "education": 0}, True),
+    ({"skill": 0.2, "experience": 0.2, "education": 0.2}, False),
+    ({"skill": 0.5, "experience": 0.6, "education": -0.1}, False),
+)
+
+
+@pytest.mark.parametrize(
+    ("weights", "is_valid"),
+    _WEIGHT_CASES,
+    ids=["valid_mixed", "valid_edge", "sum_lt_one", "negative"],
+)
+def test_search_request_weights_sum_to_one(weights, is_valid):
+    serializer = SearchRunRequestSerializer(
+        data={"job_offer_text": "backend engineer", "weights": weights}
+    )
+    assert serializer.is_valid() is is_valid
@@ -1,60 +1,55 @@
 from __future__ import annotations
 
+from datetime import timedelta
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
-from celery.exceptions import Retry
+from celery.exceptions import Retry, SoftTimeLimitExceeded
+from django.utils import timezone
 
-from src.core.models import JobStatus
-from src.core.tasks import ingest_upload_item_task, ping
+from src.core.models import CVDocument, JobStatus, UploadBatch, UploadItem
+from src.core.tasks import (
+    INGEST_STALE_AFTER,
+    _record_item_finished,
+    _terminal_batch_status,
+    ingest_upload_item_task,
+    ping,
+)
+
+_BATCH_TEMPLATE = {"started_at": None, "status": JobStatus.PENDING}
+_ITEM_TEMPLATE = {"id": "item-1", "started_at": None, "completed_at": None, "error_message": ""}
 
 
 def _build_item(*, status: str = JobStatus.PENDING, with_document: bool = True):
-    batch = SimpleNamespace(
-        started_at=None,
-        status=JobStatus.PENDING,
-        save=MagicMock(),
-    )
+    batch = SimpleNamespace(**_BATCH_TEMPLATE, save=MagicMock())
     item = SimpleNamespace(
-        id="item-1",
+        **_ITEM_TEMPLATE,
         status=status,
         document_id="doc-1" if with_document else None,
+        document=SimpleNamespace(id="doc-1") if with_document else None,
         batch=batch,
-        started_at=None,
-        completed_at=None,
-        error_message="",
         save=MagicMock(),
     )
     return item, batch
 
 
-def _mock_upload_item_queryset(mock_upload_item_cls, item):
-    select_related_qs = MagicMock()
-    filtered_qs = MagicMock()
-    mock_upload_item_cls.objects.select_related.return_value = select_related_qs
-    select_related_qs.filter.return_value = filtered_qs
-    filtered_qs.first.return_value = item
-
-
 def test_ping_task_without_worker():
     assert ping() == "pong"
 
 
-@patch("src.core.tasks._refresh_batch_status")
-@patch("src.core.tasks.CVIngestionPipeline")
-@patch("src.core.tasks.CVDocument")
+@patch("src.core.tasks._record_item_finished")
+@patch("src.core.tasks.get_ingestion_pipeline")
 @patch("src.core.tasks.UploadItem")
 def test_ingest_upload_item_task_success_without_worker(
     mock_upload_item_cls,
-    mock_cv_document_cls,
-    mock_pipeline_cls,
-    mock_refresh_batch_status,
+    mock_get_pipeline,
+    mock_record_item_finished,
+    make_upload_item_qs,
 ):
     item, batch = _build_item()
-    _mock_upload_item_queryset(mock_upload_item_cls, item)
-    mock_cv_document_cls.objects.get.return_value = SimpleNamespace(id="doc-1")
-    mock_pipeline = mock_pipeline_cls.return_value
+    make_upload_item_qs(mock_upload_item_cls, item)
+    mock_pipeline = mock_get_pipeline.return_value
 
     out = ingest_upload_item_task.apply(args=("item-1",), throw=True).get()
 
@@ -63,49 +58,44 @@ def test_ingest_upload_item_task_success_without_worker(
     assert item.started_at is not None
     assert item.completed_at is not None
     assert batch.started_at is not None
-    mock_pipeline.ingest_cv_document.assert_called_once()
-    mock_refresh_batch_status.assert_called_once_with(batch)
+    mock_pipeline.ingest_cv_document.assert_called_once_with(item.document)
+    mock_record_item_finished.assert_called_once_with(batch, failed=False)
 
 
-@patch("src.core.tasks._refresh_batch_status")
-@patch("src.core.tasks.CVIngestionPipeline")
-@patch("src.core.tasks.CVDocument")
+@patch("src.core.tasks._record_item_finished")
+@patch("src.core.tasks.get_ingestion_pipeline")
 @patch("src.core.tasks.UploadItem")
 def test_ingest_upload_item_task_retry_without_worker(
     mock_upload_item_cls,
-    mock_cv_document_cls,
-    mock_pipeline_cls,
-    mock_refresh_batch_status,
+    mock_get_pipeline,
+    mock_record_item_finished,
+    make_upload_item_qs,
 ):
     item, batch = _build_item()
-    _mock_upload_item_queryset(mock_upload_item_cls, item)
-    mock_cv_document_cls.objects.get.return_value = SimpleNamespace(id="doc-1")
-    mock_pipeline_cls.return_value.ingest_cv_document.side_effect = RuntimeError("temporary failure")
+    make_upload_item_qs(mock_upload_item_cls, item)
+    mock_get_pipeline.return_value.ingest_cv_document.side_effect = RuntimeError("temporary failure")
 
     with pytest.raises(Retry):
         ingest_upload_item_task.apply(args=("item-1",), throw=True)
 
     assert item.status == JobStatus.PENDING
     assert "retrying (1/3)" in item.error_message
-    # Called once in except retry branch and once in finally.
-    assert mock_refresh_batch_status.call_count == 2
-    assert mock_refresh_batch_status.call_args.args[0] == batch
+    # A retry leaves the item unfinished, so the batch counters are not touched.
+    mock_record_item_finished.assert_not_called()
 
 
-@patch("src.core.tasks._refresh_batch_status")
-@patch("src.core.tasks.CVIngestionPipeline")
-@patch("src.core.tasks.CVDocument")
+@patch("src.core.tasks._record_item_finished")
+@patch("src.core.tasks.get_ingestion_pipeline")
 @patch("src.core.tasks.UploadItem")
 def test_ingest_upload_item_task_failed_after_max_retries_without_worker(
     mock_upload_item_cls,
-    mock_cv_document_cls,
-    mock_pipeline_cls,
-    mock_refresh_batch_status,
+    mock_get_pipeline,
+    mock_record_item_finished,
+    make_upload_item_qs,
 ):
     item, batch = _build_item()
-    _mock_upload_item_queryset(mock_upload_item_cls, item)
-    mock_cv_document_cls.objects.get.return_value = SimpleNamespace(id="doc-1")
-    mock_pipeline_cls.return_value.ingest_cv_document.side_effect = RuntimeError("hard failure")
+    make_upload_item_qs(mock_upload_item_cls, item)
+    mock_get_pipeline.return_value.ingest_cv_document.side_effect = RuntimeError("hard failure")
 
     out = ingest_upload_item_task.apply(args=("item-1",), throw=True, retries=3).get()
 
@@ -113,4 +103,110 @@ def test_ingest_upload_item_task_failed_after_max_retries_without_worker(
     assert item.status == JobStatus.FAILED
     assert item.completed_at is not None
     assert item.error_message == "hard failure"
-    mock_refresh_batch_status.assert_called_once_with(batch)
+    mock_record_item_finished.assert_called_once_with(batch, failed=True)
+
+
+@patch("src.core.tasks._record_item_finished")
+@patch("src.core.tasks.get_ingestion_pipeline")
+@patch("src.core.tasks.UploadItem")
+def test_ingest_upload_item_task_soft_time_limit_fails_item_and_counts_it(
+    mock_upload_item_cls,
+    mock_get_pipeline,
+    mock_record_item_finished,
+    make_upload_item_qs,
+):
+    item, batch = _build_item()
+    make_upload_item_qs(mock_upload_item_cls, item)
+    mock_get_pipeline.return_value.ingest_cv_document.side_effect = SoftTimeLimitExceeded()
+
+    ingest_upload_item_task.apply(args=("item-1",), throw=True, retries=3).get()
+
+    assert item.status == JobStatus.FAILED
+    assert "exceeded" in item.error_message
+    mock_record_item_finished.assert_called_once_with(batch, failed=True)
+
+
+@patch("src.core.tasks._record_item_finished")
+@patch("src.core.tasks.get_ingestion_pipeline")
+@patch("src.core.tasks.UploadItem")
+def test_ingest_upload_item_task_skips_item_claimed_elsewhere(
+    mock_upload_item_cls,
+    mock_get_pipeline,
+    mock_record_item_finished,
+    make_upload_item_qs,
+):
+    item, _ = _build_item(status=JobStatus.RUNNING)
+    make_upload_item_qs(mock_upload_item_cls, item)
+    mock_upload_item_cls.objects.filter.return_value.update.return_value = 0
+
+    out = ingest_upload_item_task.apply(args=("item-1",), throw=True).get()
+
+    assert out == "item-1"
+    mock_get_pipeline.return_value.ingest_cv_document.assert_not_called()
+    mock_record_item_finished.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("total", "failed", "expected"),
+    [
+        (3, 0, JobStatus.SUCCESS),
+        (3, 1, JobStatus.PARTIAL),
+        (3, 3, JobStatus.FAILED),
+    ],
+)
+def test_terminal_batch_status(total, failed, expected):
+    assert _terminal_batch_status(total, failed) == expected
+
+
+@pytest.mark.django_db
+def test_record_item_finished_sets_terminal_status_after_last_item():
+    batch = UploadBatch.objects.create(status=JobStatus.RUNNING, total_files=2)
+
+    _record_item_finished(batch, failed=False)
+    batch.refresh_from_db()
+    assert batch.processed_files == 1
+    assert batch.status == JobStatus.RUNNING
+    assert batch.completed_at is None
+
+    _record_item_finished(batch, failed=True)
+    batch.refresh_from_db()
+    assert batch.processed_files == 2
+    assert batch.failed_files == 1
+    assert batch.status == JobStatus.PARTIAL
+    assert batch.completed_at is not None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    ("started_ago", "reclaimed"),
+    [(INGEST_STALE_AFTER + 60, True), (60, False)],
+    ids=["stale_after_crash", "live_elsewhere"],
+)
+@patch("src.core.tasks.get_ingestion_pipeline")
+def test_ingest_upload_item_task_redelivery_reclaims_only_stale_running_items(
+    mock_get_pipeline, started_ago, reclaimed
+):
+    batch = UploadBatch.objects.create(
+        status=JobStatus.RUNNING, total_files=1, started_at=timezone.now()
+    )
+    item = UploadItem.objects.create(
+        batch=batch,
+        document=CVDocument.objects.create(),
+        status=JobStatus.RUNNING,
+        started_at=timezone.now() - timedelta(seconds=started_ago),
+    )
+
+    ingest_upload_item_task.apply(args=(str(item.id),), throw=True)
+
+    item.refresh_from_db()
+    batch.refresh_from_db()
+    if reclaimed:
+        assert item.status == JobStatus.SUCCESS
+        assert batch.processed_files == 1
+        assert batch.status == JobStatus.SUCCESS
+        mock_get_pipeline.return_value.ingest_cv_document.assert_called_once()
+    else:
+        assert item.status == JobStatus.RUNNING
+        assert batch.processed_files == 0
+        assert batch.completed_at is None
+        mock_get_pipeline.return_value.ingest_cv_document.assert_not_called()
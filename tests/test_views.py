@@ -1,32 +1,76 @@
 from __future__ import annotations
 
+import hashlib
 import uuid
 from unittest.mock import MagicMock, patch
 
 import pytest
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
-from src.core.models import CVDocument, JobStatus
+from src.core.models import CVDocument, JobStatus, UploadItem
 from src.core.tasks import DEFAULT_STEPS
+from tests.conftest import DEFAULT_CV_BYTES
+
+# Resolved once at import; pytest-django has already configured Django by then.
+_URL_UPLOAD = reverse("cv-upload")
+_URL_SEARCH = reverse("search-run-create")
+_URL_CV_LIST = reverse("cv-list")
+_URL_JOB_DESCRIPTION = reverse("job-description-create")
 
 @pytest.mark.django_db
-@patch("src.core.views.CvSerializer")
-def test_cv_upload_view_success(mock_serializer_cls, api_client, make_uploaded_file):
-    mock_serializer = MagicMock()
-    mock_serializer.data = {"id": "doc-id"}
-    mock_serializer.is_valid.return_value = True
-    mock_serializer_cls.return_value = mock_serializer
+@patch("src.core.views.ingest_upload_item_task")
+def test_cv_upload_view_enqueues_ingestion(
+    mock_task,
+    api_client,
+    make_uploaded_file,
+    temp_media_root,
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            _URL_UPLOAD,
+            {"source_file": make_uploaded_file()},
+            format="multipart",
+        )
 
-    response = api_client.post(
-        reverse("cv-upload"),
-        {"source_file": make_uploaded_file()},
-        format="multipart",
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    body = response.json()
+    item = UploadItem.objects.select_related("batch").get(id=body["upload_item_id"])
+    assert str(item.document_id) == body["document_id"]
+    assert item.status == JobStatus.PENDING
+    assert item.batch.total_files == 1
+    assert body["status_url"] == reverse("cv-bulk-upload-status", args=[item.batch_id])
+    mock_task.delay.assert_called_once_with(body["upload_item_id"])
+
+@pytest.mark.django_db
+@patch("src.core.views.ingest_upload_item_task")
+def test_cv_upload_view_reuses_already_ingested_document(
+    mock_task,
+    api_client,
+    make_uploaded_file,
+    temp_media_root,
+    django_capture_on_commit_callbacks,
+):
+    existing = CVDocument.objects.create(
+        source_checksum=hashlib.sha256(DEFAULT_CV_BYTES).hexdigest(),
+        ingested_at=timezone.now(),
     )
 
-    assert response.status_code == status.HTTP_201_CREATED
-    mock_serializer.is_valid.assert_called_once_with()
-    mock_serializer.save.assert_called_once()
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.post(
+            _URL_UPLOAD, {"source_file": make_uploaded_file()}, format="multipart"
+        )
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    body = response.json()
+    assert body["document_id"] == str(existing.id)
+    assert body["status"] == JobStatus.SUCCESS
+    item = UploadItem.objects.select_related("batch").get(id=body["upload_item_id"])
+    assert item.batch.status == JobStatus.SUCCESS
+    assert item.batch.started_at is not None
+    mock_task.delay.assert_not_called()
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
@@ -42,7 +86,7 @@ def test_cv_upload_view_success(mock_serializer_cls, api_client, make_uploaded_f
     ],
 )
 def test_search_run_create_view_bad_request(payload, error_key, expected_error, api_client):
-    response = api_client.post(reverse("search-run-create"), payload, format="json")
+    response = api_client.post(_URL_SEARCH, payload, format="json")
 
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert response.json()[error_key][0] == expected_error
@@ -63,7 +107,7 @@ def test_search_run_create_view_success(mock_create, mock_delay, api_client):
         "weights": {"skill": 0.1, "experience": 0.7, "education": 0.2},
         "top_k": 5,
     }
-    response = api_client.post(reverse("search-run-create"), payload, format="json")
+    response = api_client.post(_URL_SEARCH, payload, format="json")
 
     assert response.status_code == status.HTTP_202_ACCEPTED
     assert response.json()["run_id"] == str(run_id)
@@ -92,7 +136,7 @@ def test_search_run_create_view_success_with_job_description_id(mock_create, moc
     )
 
     payload = {"job_description_id": "36ec8f27-17b1-4fdd-b3f6-ac6ca42f4c17", "top_k": 5}
-    response = api_client.post(reverse("search-run-create"), payload, format="json")
+    response = api_client.post(_URL_SEARCH, payload, format="json")
 
     assert response.status_code == status.HTTP_202_ACCEPTED
     assert response.json()["run_id"] == str(run_id)
@@ -119,7 +163,7 @@ def test_search_run_create_view_task_enqueue_error(mock_create, _mock_delay, api
 
     with pytest.raises(RuntimeError, match="queue unavailable"):
         api_client.post(
-            reverse("search-run-create"),
+            _URL_SEARCH,
             {"job_offer_text": "Backend engineer"},
             format="json",
         )
@@ -129,8 +173,7 @@ def test_search_run_create_view_task_enqueue_error(mock_create, _mock_delay, api
 def test_list_cv(api_client):
     cv1 = CVDocument.objects.create()
     cv2 = CVDocument.objects.create()
-    url = reverse("cv-list")
-    response = api_client.get(url, {"ids": [str(cv1.id), str(cv2.id)]})
+    response = api_client.get(_URL_CV_LIST, {"ids": [str(cv1.id), str(cv2.id)]})
 
     assert response.status_code == status.HTTP_200_OK
     assert len(response.data) == 2
@@ -144,7 +187,7 @@ def test_job_description_view_success(mock_serializer_cls, api_client):
     mock_serializer_cls.return_value = mock_serializer
 
     response = api_client.post(
-        reverse("job-description-create"),
+        _URL_JOB_DESCRIPTION,
         {"text": "Backend engineer with Python"},
         format="json",
     )